@@ -78,6 +78,11 @@ def dashboard(request):
             'inquiry_count': inquiry_count,
             'recent_bookings': Booking.objects.filter(student=request.user).order_by('-created_at')[:5],
         })
+        
+        # Listings scored against the student's saved preferences
+        if hasattr(request.user, 'student_profile'):
+            from properties.matching import get_matches_for_profile
+            context['matched_properties'] = get_matches_for_profile(request.user.student_profile)
     
     elif request.user.user_type == 'landlord':
         # Landlord dashboard
@@ -0,0 +1,63 @@
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from .models import Booking
+
+# Only approved bookings take up a property's capacity for good. Queries must
+# filter on this exact status for Postgres to use the partial index on Booking.
+BLOCKING_STATUS = 'approved'
+
+
+def overlapping_bookings(check_in, check_out):
+    """Blocking bookings that share at least one night with [check_in, check_out)."""
+    return Booking.objects.filter(
+        status=BLOCKING_STATUS,
+        check_in_date__lt=check_out,
+        check_out_date__gt=check_in,
+    )
+
+
+def filter_available(queryset, check_in, check_out, occupants=1):
+    """
+    Narrow a Property queryset to listings open for the whole stay with room
+    for ``occupants`` more. Booked occupants come from one correlated
+    subquery per listing, answered from the (property, check_in_date,
+    check_out_date) index; summing every overlapping stay errs on the side
+    of hiding a listing rather than showing a full one.
+    """
+    booked = overlapping_bookings(check_in, check_out).filter(
+        property=OuterRef('pk')
+    ).order_by().values('property').annotate(total=Sum('number_of_occupants')).values('total')
+    return queryset.filter(
+        Q(available_to__isnull=True) | Q(available_to__gte=check_out),
+        available_from__lte=check_in,
+    ).alias(
+        booked_occupants=Coalesce(Subquery(booked), 0)
+    ).filter(maximum_occupants__gte=F('booked_occupants') + occupants)
+
+
+def peak_occupancy(stays, check_in, check_out):
+    """Most occupants present on any single night of [check_in, check_out)."""
+    changes = []
+    for start, end, occupants in stays:
+        start, end = max(start, check_in), min(end, check_out)
+        if start < end:
+            changes.append((start, occupants))
+            changes.append((end, -occupants))
+    
+    # Departures sort before arrivals on the same day: check-out day is free
+    peak = current = 0
+    for _, delta in sorted(changes, key=lambda change: (change[0], change[1])):
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def window_error(property_obj, check_in, check_out):
+    """Why the stay falls outside the listing's availability window, or None."""
+    if check_out <= check_in:
+        return 'Check-out must be after check-in.'
+    if check_in < property_obj.available_from:
+        return f'This property is available from {property_obj.available_from:%b %d, %Y}.'
+    if property_obj.available_to and check_out > property_obj.available_to:
+        return f'This property is only available until {property_obj.available_to:%b %d, %Y}.'
+    return None
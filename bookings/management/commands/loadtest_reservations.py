@@ -0,0 +1,141 @@
+import datetime
+import statistics
+import threading
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from accounts.models import User
+from bookings.availability import peak_occupancy
+from bookings.models import Booking, CapacityHold
+from bookings.reservations import ReservationError, approve, reserve
+from properties.models import Property
+
+
+class Command(BaseCommand):
+    help = ('Fire concurrent booking requests at one throwaway property and check that '
+            'reserved and approved occupants never exceed maximum_occupants')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Booking requests to send')
+        parser.add_argument('--threads', type=int, default=20,
+                            help='Concurrent requests; each holds a database connection')
+        parser.add_argument('--capacity', type=int, default=10,
+                            help='maximum_occupants of the test property')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated rows')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The reservation load test needs PostgreSQL row locks.')
+        
+        requests = options['requests']
+        threads = options['threads']
+        if requests < 1 or threads < 1:
+            raise CommandError('--requests and --threads must be at least 1.')
+        capacity = options['capacity']
+        run_id = uuid.uuid4().hex[:8]
+        check_in = datetime.date.today() + datetime.timedelta(days=30)
+        check_out = check_in + datetime.timedelta(days=120)
+        
+        landlord = User.objects.create_user(username=f'loadtest-landlord-{run_id}', user_type='landlord')
+        students = User.objects.bulk_create([
+            User(username=f'loadtest-student-{run_id}-{i}', user_type='student') for i in range(requests)
+        ])
+        property_obj = Property.objects.create(
+            landlord=landlord, title=f'Load test {run_id}', description='Reservation load test',
+            property_type='shared', room_type='shared', address='1 Test Street', city='Loadtest',
+            state='LT', zip_code='00000', price_per_month=500, bedrooms=capacity, bathrooms=1,
+            nearest_university='Test University', distance_to_university=1,
+            available_from=check_in, maximum_occupants=capacity, is_active=False,
+        )
+        
+        try:
+            reserved, reserve_times, reserve_elapsed = self.run_phase(requests, threads, lambda i: reserve(Booking(
+                student=students[i], landlord=landlord, property=property_obj,
+                check_in_date=check_in, check_out_date=check_out, total_price=2000,
+            )))
+            self.report('reserve', requests, reserved, reserve_times, reserve_elapsed)
+            
+            held = list(CapacityHold.objects.filter(property=property_obj).values_list(
+                'check_in_date', 'check_out_date', 'occupants'))
+            
+            pending = list(Booking.objects.filter(property=property_obj, status='pending'))
+            approved, approve_times, approve_elapsed = self.run_phase(
+                len(pending), threads, lambda i: approve(pending[i])
+            )
+            self.report('approve', len(pending), approved, approve_times, approve_elapsed)
+            
+            booked = list(Booking.objects.filter(property=property_obj, status='approved').values_list(
+                'check_in_date', 'check_out_date', 'number_of_occupants'))
+            peak_held = peak_occupancy(held, check_in, check_out)
+            peak_booked = peak_occupancy(booked, check_in, check_out)
+            self.stdout.write(f'Peak held occupants: {peak_held}/{capacity}')
+            self.stdout.write(f'Peak approved occupants: {peak_booked}/{capacity}')
+            
+            if peak_held > capacity or peak_booked > capacity:
+                raise CommandError('Overbooked: capacity was exceeded under concurrency.')
+            if reserved != min(requests, capacity):
+                raise CommandError(f'Expected {min(requests, capacity)} reservations, got {reserved}.')
+            self.stdout.write(self.style.SUCCESS('No double-booking detected.'))
+        finally:
+            if not options['keep']:
+                property_obj.delete()
+                User.objects.filter(username__startswith='loadtest-', username__contains=run_id).delete()
+
+    def run_phase(self, count, threads, action):
+        if not count:
+            return 0, [], 0.0
+        
+        # A bounded pool keeps the connections opened within max_connections;
+        # the workers start together and then pull requests until none are left
+        threads = min(threads, count)
+        barrier = threading.Barrier(threads)
+        pending = iter(range(count))
+        pending_lock = threading.Lock()
+        results = [None] * count
+        timings = [0.0] * count
+        
+        def next_request():
+            with pending_lock:
+                return next(pending, None)
+        
+        def worker():
+            try:
+                barrier.wait()
+                for i in iter(next_request, None):
+                    started = time.perf_counter()
+                    try:
+                        action(i)
+                        results[i] = True
+                    except ReservationError:
+                        results[i] = False
+                    timings[i] = time.perf_counter() - started
+            finally:
+                connections.close_all()
+        
+        # The main thread's connection would otherwise sit idle through the phase
+        connection.close()
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        
+        failed = [i for i, result in enumerate(results) if result is None]
+        if failed:
+            raise CommandError(f'{len(failed)} requests raised unexpected errors.')
+        return sum(results), timings, elapsed
+
+    def report(self, phase, count, succeeded, timings, elapsed):
+        if not timings:
+            self.stdout.write(f'{phase}: no requests')
+            return
+        quantiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+        self.stdout.write(
+            f'{phase}: {count} requests in {elapsed:.2f}s ({count / elapsed:.1f}/s), '
+            f'{succeeded} succeeded, {count - succeeded} refused; '
+            f'p50 {quantiles[49] * 1000:.1f}ms, p95 {quantiles[94] * 1000:.1f}ms, '
+            f'p99 {quantiles[98] * 1000:.1f}ms'
+        )
@@ -1,3 +1,4 @@
+import builtins
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from accounts.models import User
@@ -49,16 +50,65 @@ class Booking(models.Model):
     
     class Meta:
         ordering = ['-booked_at']
+        indexes = [
+            # Availability anti-join: approved stays per property, scanned by date
+            models.Index(
+                fields=['property', 'check_in_date', 'check_out_date'],
+                name='booking_approved_range_idx',
+                condition=models.Q(status='approved'),
+            ),
+        ]
     
     def __str__(self):
         return f"Booking {self.id} - {self.property.title}"
     
-    @property
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember loaded values so save handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def get_loaded_value(self, field_name):
+        return getattr(self, '_loaded_values', {}).get(field_name)
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save handlers have seen the old values; the saved ones are the baseline now
+        update_fields = kwargs.get('update_fields')
+        fields = [f for f in self._meta.concrete_fields if not update_fields or f.name in update_fields]
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{f.attname: getattr(self, f.attname) for f in fields},
+        }
+    
+    # The ``property`` foreign key shadows the builtin inside the class body
+    @builtins.property
     def duration_months(self):
         from dateutil.relativedelta import relativedelta
         rd = relativedelta(self.check_out_date, self.check_in_date)
         return rd.years * 12 + rd.months
 
+class CapacityHold(models.Model):
+    """Capacity set aside for a pending booking while the request is fresh."""
+    
+    booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='capacity_hold')
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='capacity_holds')
+    check_in_date = models.DateField()
+    check_out_date = models.DateField()
+    occupants = models.IntegerField(default=1)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['property', 'check_in_date', 'check_out_date'], name='capacity_hold_range_idx'),
+            models.Index(fields=['expires_at'], name='capacity_hold_expiry_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Hold for booking {self.booking_id} until {self.expires_at}"
+
 class Inquiry(models.Model):
     STATUS_CHOICES = (
         ('new', 'New'),
@@ -0,0 +1,103 @@
+import datetime
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from properties.models import Property
+from .availability import overlapping_bookings, peak_occupancy, window_error
+from .models import Booking, CapacityHold
+
+
+class ReservationError(Exception):
+    pass
+
+
+def hold_duration():
+    return datetime.timedelta(minutes=settings.BOOKING_HOLD_MINUTES)
+
+
+def _lock_property(property_id):
+    # Serializes reservations per listing. FOR NO KEY UPDATE still lets other
+    # transactions insert rows referencing the property.
+    return Property.objects.select_for_update(no_key=True).get(pk=property_id)
+
+
+def occupied_stays(property_id, check_in, check_out, exclude_booking=None):
+    """(check_in, check_out, occupants) for approved bookings and live holds overlapping the stay."""
+    bookings = overlapping_bookings(check_in, check_out).filter(property_id=property_id)
+    holds = CapacityHold.objects.filter(
+        property_id=property_id,
+        check_in_date__lt=check_out,
+        check_out_date__gt=check_in,
+        expires_at__gt=timezone.now(),
+    )
+    if exclude_booking is not None:
+        bookings = bookings.exclude(pk=exclude_booking.pk)
+        holds = holds.exclude(booking=exclude_booking)
+    
+    return (
+        list(bookings.values_list('check_in_date', 'check_out_date', 'number_of_occupants'))
+        + list(holds.values_list('check_in_date', 'check_out_date', 'occupants'))
+    )
+
+
+def check_capacity(property_obj, check_in, check_out, occupants, exclude_booking=None):
+    error = window_error(property_obj, check_in, check_out)
+    if error:
+        raise ReservationError(error)
+    if occupants > property_obj.maximum_occupants:
+        raise ReservationError(f'This property sleeps at most {property_obj.maximum_occupants}.')
+    
+    stays = occupied_stays(property_obj.pk, check_in, check_out, exclude_booking)
+    if peak_occupancy(stays, check_in, check_out) + occupants > property_obj.maximum_occupants:
+        raise ReservationError('There is not enough space left at this property for those dates.')
+
+
+def reserve(booking):
+    """
+    Save a new pending booking and hold its capacity for BOOKING_HOLD_MINUTES.
+    Raises ReservationError, saving nothing, when the stay does not fit.
+    """
+    with transaction.atomic():
+        property_obj = _lock_property(booking.property_id)
+        check_capacity(property_obj, booking.check_in_date, booking.check_out_date, booking.number_of_occupants)
+        booking.save()
+        CapacityHold.objects.create(
+            booking=booking,
+            property=property_obj,
+            check_in_date=booking.check_in_date,
+            check_out_date=booking.check_out_date,
+            occupants=booking.number_of_occupants,
+            expires_at=timezone.now() + hold_duration(),
+        )
+    return booking
+
+
+def approve(booking):
+    """
+    Approve a booking, re-checking capacity: its hold may have lapsed since
+    it was made. Returns the booking as re-read under the property lock.
+    """
+    with transaction.atomic():
+        property_obj = _lock_property(booking.property_id)
+        # The caller's copy predates the lock; a concurrent cancel must not be overwritten
+        booking = Booking.objects.select_for_update().get(pk=booking.pk)
+        if booking.status != 'pending':
+            raise ReservationError(f'This booking is already {booking.status}.')
+        check_capacity(
+            property_obj, booking.check_in_date, booking.check_out_date,
+            booking.number_of_occupants, exclude_booking=booking
+        )
+        booking.status = 'approved'
+        booking.approved_at = timezone.now()
+        booking.save(update_fields=['status', 'approved_at'])
+        CapacityHold.objects.filter(booking=booking).delete()
+    return booking
+
+
+def release(booking):
+    CapacityHold.objects.filter(booking=booking).delete()
+
+
+def purge_expired_holds():
+    deleted, _ = CapacityHold.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.page_cache import AVAILABILITY_TAG, invalidate_tags, property_tag
+from properties.models import Property
+from properties.search_cache import search_cache
+from .availability import BLOCKING_STATUS
+from .models import Booking
+
+# What decides how much of its listing's capacity a blocking booking takes up
+BLOCKING_FIELDS = ('status', 'check_in_date', 'check_out_date', 'number_of_occupants')
+
+
+def _blocked(values):
+    if values.get('status') != BLOCKING_STATUS:
+        return None
+    return tuple(values.get(field) for field in BLOCKING_FIELDS)
+
+
+def _invalidate_availability(booking):
+    # The view that changed the booking has usually loaded its property already
+    if Booking.property.is_cached(booking):
+        listing = (booking.property.city, booking.property.property_type)
+    else:
+        listing = Property.objects.filter(pk=booking.property_id).values_list('city', 'property_type').first()
+    if listing:
+        search_cache.invalidate(*listing)
+    invalidate_tags(AVAILABILITY_TAG, property_tag(booking.property_id))
+
+
+@receiver(post_save, sender=Booking)
+def invalidate_availability_on_save(sender, instance, created, **kwargs):
+    # Date-range searches only count approved bookings; other changes leave them as they were
+    before = None if created else _blocked(getattr(instance, '_loaded_values', {}))
+    after = _blocked({field: getattr(instance, field) for field in BLOCKING_FIELDS})
+    if before != after:
+        _invalidate_availability(instance)
+
+
+@receiver(post_delete, sender=Booking)
+def invalidate_availability_on_delete(sender, instance, **kwargs):
+    if instance.status == BLOCKING_STATUS:
+        _invalidate_availability(instance)
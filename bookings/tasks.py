@@ -0,0 +1,7 @@
+from celery import shared_task
+from .reservations import purge_expired_holds
+
+
+@shared_task
+def purge_expired_holds_task():
+    return purge_expired_holds()
@@ -1,3 +1,103 @@
-from django.test import TestCase
+import datetime
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from accounts.models import User
+from properties.models import Property
+from .availability import filter_available, peak_occupancy
+from .models import Booking, CapacityHold
+from .reservations import ReservationError, approve, reserve
 
-# Create your tests here.
+TODAY = datetime.date(2026, 9, 1)
+
+
+def day(offset):
+    return TODAY + datetime.timedelta(days=offset)
+
+
+class PeakOccupancyTests(SimpleTestCase):
+    def test_overlapping_stays_add_up(self):
+        stays = [(day(0), day(10), 1), (day(5), day(15), 2)]
+        self.assertEqual(peak_occupancy(stays, day(0), day(20)), 3)
+
+    def test_check_out_day_is_free_for_the_next_arrival(self):
+        stays = [(day(0), day(10), 2), (day(10), day(20), 2)]
+        self.assertEqual(peak_occupancy(stays, day(0), day(20)), 2)
+
+    def test_stays_are_clipped_to_the_window(self):
+        stays = [(day(0), day(10), 2), (day(12), day(20), 1)]
+        self.assertEqual(peak_occupancy(stays, day(10), day(20)), 1)
+        self.assertEqual(peak_occupancy(stays, day(20), day(30)), 0)
+
+    def test_sequential_stays_do_not_stack(self):
+        stays = [(day(0), day(5), 1), (day(5), day(10), 1), (day(2), day(8), 1)]
+        self.assertEqual(peak_occupancy(stays, day(0), day(10)), 2)
+
+
+class ReservationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.landlord = User.objects.create_user(username='landlord', password='password', user_type='landlord')
+        cls.student = User.objects.create_user(username='student', password='password', user_type='student')
+        cls.property = Property.objects.create(
+            landlord=cls.landlord, title='Shared flat', description='Two beds near campus',
+            property_type='apartment', room_type='double', address='1 College Road', city='Boston',
+            state='MA', zip_code='02115', price_per_month=900, bedrooms=1, bathrooms=1,
+            nearest_university='Northeastern University', distance_to_university=1,
+            available_from=TODAY, maximum_occupants=2, is_active=True, is_verified=True,
+        )
+
+    def booking(self, check_in, check_out, occupants=1):
+        return Booking(
+            student=self.student, landlord=self.landlord, property=self.property,
+            check_in_date=check_in, check_out_date=check_out,
+            number_of_occupants=occupants, total_price=900,
+        )
+
+    def test_reserve_holds_capacity(self):
+        reserve(self.booking(day(0), day(30), occupants=2))
+        with self.assertRaises(ReservationError):
+            reserve(self.booking(day(10), day(20)))
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_back_to_back_stays_fit(self):
+        reserve(self.booking(day(0), day(30), occupants=2))
+        reserve(self.booking(day(30), day(60), occupants=2))
+        self.assertEqual(CapacityHold.objects.count(), 2)
+
+    def test_stays_fill_up_to_maximum_occupants(self):
+        reserve(self.booking(day(0), day(30)))
+        reserve(self.booking(day(15), day(45)))
+        with self.assertRaises(ReservationError):
+            reserve(self.booking(day(20), day(25)))
+
+    def test_approve_rechecks_capacity_after_the_hold_lapses(self):
+        first = reserve(self.booking(day(0), day(30), occupants=2))
+        CapacityHold.objects.filter(booking=first).update(expires_at=timezone.now() - datetime.timedelta(minutes=1))
+
+        # The lapsed hold let a second stay in and get approved first
+        second = approve(reserve(self.booking(day(10), day(20), occupants=2)))
+        self.assertEqual(second.status, 'approved')
+        self.assertFalse(CapacityHold.objects.filter(booking=second).exists())
+
+        with self.assertRaises(ReservationError):
+            approve(first)
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'pending')
+
+    def test_approve_refuses_a_booking_that_is_no_longer_pending(self):
+        booking = reserve(self.booking(day(0), day(30)))
+        Booking.objects.filter(pk=booking.pk).update(status='cancelled')
+        with self.assertRaises(ReservationError):
+            approve(booking)
+
+    def test_stays_outside_the_availability_window_are_refused(self):
+        with self.assertRaises(ReservationError):
+            reserve(self.booking(day(-5), day(10)))
+        with self.assertRaises(ReservationError):
+            reserve(self.booking(day(10), day(10)))
+
+    def test_search_hides_listings_full_for_the_stay(self):
+        approve(reserve(self.booking(day(0), day(30), occupants=2)))
+        properties = Property.objects.filter(pk=self.property.pk)
+        self.assertFalse(filter_available(properties, day(10), day(20)).exists())
+        self.assertTrue(filter_available(properties, day(30), day(60)).exists())
@@ -1,13 +1,16 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q
 from django.views.generic import ListView, CreateView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from .models import Booking, Inquiry
+from .reservations import ReservationError, approve, release, reserve
 from .forms import BookingForm, InquiryForm
 from accounts.decorators import student_required, landlord_required
+from core.outbox import publish
 from properties.models import Property
 import datetime
 
@@ -30,20 +33,25 @@ def create_booking(request, property_id):
                 months = 1
             booking.total_price = property_obj.price_per_month * months
             
-            booking.save()
-            
-            # Create notification for landlord
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=property_obj.landlord,
-                notification_type='booking_request',
-                title=f'New Booking Request',
-                message=f'{request.user.get_full_name()} has requested to book your property: {property_obj.title}',
-                data={'booking_id': str(booking.id), 'property_id': str(property_obj.id)}
-            )
-            
-            messages.success(request, 'Booking request sent successfully!')
-            return redirect('booking_detail', pk=booking.id)
+            try:
+                with transaction.atomic():
+                    reserve(booking)
+                    
+                    # Notify the landlord once the booking commits
+                    publish(
+                        'booking_request',
+                        property_obj.landlord,
+                        title=f'New Booking Request',
+                        message=f'{request.user.get_full_name()} has requested to book your property: {property_obj.title}',
+                        data={'booking_id': str(booking.id), 'property_id': str(property_obj.id)},
+                        dedupe_key=f'booking_request:{booking.id}'
+                    )
+            except ReservationError as e:
+                form.add_error(None, str(e))
+                messages.error(request, str(e))
+            else:
+                messages.success(request, 'Booking request sent successfully!')
+                return redirect('booking_detail', pk=booking.id)
         else:
             messages.error(request, 'Please correct the errors below.')
     else:
@@ -107,27 +115,35 @@ def update_booking_status(request, pk, status):
         return redirect('booking_detail', pk=pk)
     
     if request.method == 'POST':
-        booking.status = status
-        
-        # Set timestamp for status change
-        if status == 'approved':
-            booking.approved_at = datetime.datetime.now()
-        elif status == 'cancelled':
-            booking.cancelled_at = datetime.datetime.now()
-        elif status == 'completed':
-            booking.completed_at = datetime.datetime.now()
-        
-        booking.save()
-        
-        # Create notification for student
-        from notifications.models import Notification
-        Notification.objects.create(
-            user=booking.student,
-            notification_type=f'booking_{status}',
-            title=f'Booking {status.capitalize()}',
-            message=f'Your booking for {booking.property.title} has been {status}.',
-            data={'booking_id': str(booking.id)}
-        )
+        try:
+            with transaction.atomic():
+                if status == 'approved':
+                    # Capacity is re-checked under the property lock; the request's hold may have lapsed
+                    booking = approve(booking)
+                else:
+                    booking.status = status
+                    
+                    # Set timestamp for status change
+                    if status == 'cancelled':
+                        booking.cancelled_at = datetime.datetime.now()
+                    elif status == 'completed':
+                        booking.completed_at = datetime.datetime.now()
+                    
+                    booking.save()
+                    release(booking)
+                
+                # Notify the student
+                publish(
+                    f'booking_{status}',
+                    booking.student,
+                    title=f'Booking {status.capitalize()}',
+                    message=f'Your booking for {booking.property.title} has been {status}.',
+                    data={'booking_id': str(booking.id)},
+                    dedupe_key=f'booking_{status}:{booking.id}'
+                )
+        except ReservationError as e:
+            messages.error(request, str(e))
+            return redirect('booking_detail', pk=pk)
         
         messages.success(request, f'Booking has been {status}.')
     
@@ -144,17 +160,18 @@ def create_inquiry(request, property_id):
             inquiry = form.save(commit=False)
             inquiry.student = request.user
             inquiry.property = property_obj
-            inquiry.save()
-            
-            # Create notification for landlord
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=property_obj.landlord,
-                notification_type='inquiry',
-                title='New Property Inquiry',
-                message=f'{request.user.get_full_name()} has inquired about your property: {property_obj.title}',
-                data={'inquiry_id': str(inquiry.id), 'property_id': str(property_obj.id)}
-            )
+            with transaction.atomic():
+                inquiry.save()
+                
+                # Notify the landlord once the inquiry commits
+                publish(
+                    'inquiry',
+                    property_obj.landlord,
+                    title='New Property Inquiry',
+                    message=f'{request.user.get_full_name()} has inquired about your property: {property_obj.title}',
+                    data={'inquiry_id': str(inquiry.id), 'property_id': str(property_obj.id)},
+                    dedupe_key=f'inquiry:{inquiry.id}'
+                )
             
             messages.success(request, 'Inquiry sent successfully!')
             return redirect('property_detail', pk=property_id)
@@ -203,19 +220,20 @@ def update_inquiry_status(request, pk, status):
         return redirect('inquiry_detail', pk=pk)
     
     if request.method == 'POST':
-        inquiry.status = status
-        inquiry.save()
-        
-        # Create notification for student if status changed to responded
-        if status == 'responded':
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=inquiry.student,
-                notification_type='inquiry_response',
-                title='Inquiry Response',
-                message=f'The landlord has responded to your inquiry about {inquiry.property.title}.',
-                data={'inquiry_id': str(inquiry.id)}
-            )
+        with transaction.atomic():
+            inquiry.status = status
+            inquiry.save()
+            
+            # Notify the student if status changed to responded
+            if status == 'responded':
+                publish(
+                    'inquiry_response',
+                    inquiry.student,
+                    title='Inquiry Response',
+                    message=f'The landlord has responded to your inquiry about {inquiry.property.title}.',
+                    data={'inquiry_id': str(inquiry.id)},
+                    dedupe_key=f'inquiry_response:{inquiry.id}'
+                )
         
         messages.success(request, f'Inquiry status updated to {status}.')
     
@@ -0,0 +1,303 @@
+import datetime
+import statistics
+import time
+import urllib.error
+import urllib.request
+from functools import partial
+from urllib.parse import urlencode
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+# Bookings created by the benchmark carry this message so they can be removed afterwards
+BENCHMARK_MESSAGE = 'Created by the benchmark suite'
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class InProcessClient:
+    """Drives the URL conf through Django's test client, counting queries directly."""
+
+    def __init__(self, user=None):
+        # The default 'testserver' host is rejected by ALLOWED_HOSTS outside the test runner
+        self.client = Client(SERVER_NAME='localhost', raise_request_exception=False)
+        if user is not None:
+            self.client.force_login(user)
+
+    def request(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as captured:
+            if method == 'POST':
+                response = self.client.post(url, data or {})
+            else:
+                response = self.client.get(url, data)
+        return response.status_code, len(captured)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """
+    Sends real HTTP requests to a running server that shares this database.
+    Users are signed in by creating their session here; query counts come
+    from the X-Query-Count header when INSTRUMENTATION['headers'] is on.
+    """
+
+    def __init__(self, base_url, user=None):
+        self.base_url = base_url.rstrip('/')
+        self.csrf_token = get_random_string(32)
+        cookies = {settings.CSRF_COOKIE_NAME: self.csrf_token}
+        if user is not None:
+            client = Client()
+            client.force_login(user)
+            cookies[settings.SESSION_COOKIE_NAME] = client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.cookie_header = '; '.join(f'{name}={value}' for name, value in cookies.items())
+        self.opener = urllib.request.build_opener(_NoRedirect)
+
+    def request(self, method, url, data=None):
+        headers = {'Cookie': self.cookie_header}
+        body = None
+        if method == 'POST':
+            body = urlencode(data or {}).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.csrf_token
+        elif data:
+            url = f'{url}?{urlencode(data)}'
+
+        request = urllib.request.Request(self.base_url + url, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                status, response_headers = response.status, response.headers
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            status, response_headers = exc.code, exc.headers
+        queries = response_headers.get('X-Query-Count')
+        return status, int(queries) if queries is not None else None
+
+
+class Scenario:
+    """
+    One benchmarked request. ``data`` may be a callable taking the request
+    number, for requests that must differ each time; ``teardown(client,
+    requests_sent)`` undoes whatever the requests changed.
+    """
+
+    def __init__(self, name, url, user=None, method='GET', data=None, teardown=None):
+        self.name = name
+        self.url = url
+        self.user = user
+        self.method = method
+        self.data = data
+        self.teardown = teardown
+
+    def request_data(self, number):
+        return self.data(number) if callable(self.data) else self.data
+
+
+def default_fixtures():
+    """The busiest student and landlord, a staff user and the most viewed listing, or None when missing."""
+    from accounts.models import User
+    from properties.models import Property
+
+    student = (User.objects.filter(user_type='student', is_active=True)
+               .annotate(activity=Count('bookings')).order_by('-activity', 'username').first())
+    landlord = (User.objects.filter(user_type='landlord', is_active=True)
+                .annotate(listings=Count('properties')).order_by('-listings', 'username').first())
+    admin = User.objects.filter(is_staff=True, is_active=True).order_by('username').first()
+    property_obj = (Property.objects.filter(is_active=True)
+                    .exclude(landlord=student).order_by('-view_count', 'pk').first())
+    return {'student': student, 'landlord': landlord, 'admin': admin, 'property': property_obj}
+
+
+def _toggle_back(url):
+    def teardown(client, requests_sent):
+        # An odd number of toggles leaves the favorite flipped
+        if requests_sent % 2:
+            client.request('POST', url)
+    return teardown
+
+
+def _delete_benchmark_bookings(student):
+    def teardown(client, requests_sent):
+        from bookings.models import Booking
+        from core.models import OutboxEvent
+        bookings = Booking.objects.filter(student=student, student_message=BENCHMARK_MESSAGE)
+        for booking_id in bookings.values_list('pk', flat=True):
+            OutboxEvent.objects.filter(dedupe_key__startswith=f'booking_request:{booking_id}:').delete()
+        bookings.delete()
+    return teardown
+
+
+def build_scenarios(fixtures):
+    """The hot endpoints, each as the kind of user that hits it. Needs a student, a landlord and a property."""
+    student = fixtures['student']
+    landlord = fixtures['landlord']
+    admin = fixtures['admin']
+    prop = fixtures['property']
+    today = datetime.date.today()
+
+    search = reverse('property_list')
+    detail = prop.get_absolute_url()
+    scenarios = [
+        Scenario('home_anonymous', reverse('home')),
+        # Anonymous pages come from the page cache after the first request
+        Scenario('search_anonymous', search, data={'city': prop.city}),
+        Scenario('search_default', search, student),
+        Scenario('search_city', search, student, data={'city': prop.city, 'property_type': prop.property_type}),
+        Scenario('search_text', search, student, data={'query': prop.nearest_university.split()[-1]}),
+        Scenario('search_price_room', search, student, data={
+            'min_price': int(prop.price_per_month) // 2, 'max_price': int(prop.price_per_month) * 3 // 2,
+            'room_type': prop.room_type, 'ordering': 'price_per_month',
+        }),
+        Scenario('search_amenities', search, student, data={
+            'city': prop.city, 'furnished': 'on', 'wifi_included': 'on', 'has_laundry': 'on',
+        }),
+        Scenario('search_dates', search, student, data={
+            'city': prop.city,
+            'move_in': (today + datetime.timedelta(days=60)).isoformat(),
+            'move_out': (today + datetime.timedelta(days=180)).isoformat(),
+        }),
+    ]
+    if prop.latitude is not None and prop.longitude is not None:
+        scenarios.append(Scenario('search_radius', search, student, data={
+            'lat': prop.latitude, 'lng': prop.longitude, 'radius_km': 3, 'ordering': 'distance',
+        }))
+
+    scenarios += [
+        Scenario('property_detail_anonymous', detail),
+        Scenario('property_detail', detail, student),
+        Scenario('dashboard_student', reverse('dashboard'), student),
+        Scenario('dashboard_landlord', reverse('dashboard'), landlord),
+        Scenario('booking_list_student', reverse('booking_list'), student),
+        Scenario('booking_list_landlord', reverse('booking_list'), landlord),
+        Scenario('my_favorites', reverse('my_favorites'), student),
+    ]
+    if admin is not None:
+        scenarios.append(Scenario('dashboard_admin', reverse('dashboard'), admin))
+
+    toggle = reverse('toggle_favorite', kwargs={'pk': prop.pk})
+    create = reverse('create_booking', kwargs={'property_id': prop.pk})
+    # Month-long stays years ahead, one after another, so each request can be accepted
+    first_check_in = today + datetime.timedelta(days=3 * 365)
+
+    def booking_data(number):
+        check_in = first_check_in + datetime.timedelta(days=35 * number)
+        return {
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': (check_in + datetime.timedelta(days=31)).isoformat(),
+            'number_of_occupants': 1,
+            'student_message': BENCHMARK_MESSAGE,
+        }
+
+    scenarios += [
+        Scenario('favorite_toggle', toggle, student, method='POST', teardown=_toggle_back(toggle)),
+        Scenario('booking_create', create, student, method='POST', data=booking_data,
+                 teardown=_delete_benchmark_bookings(student)),
+    ]
+    return scenarios
+
+
+def _percentile(quantiles, n):
+    return round(quantiles[n - 1] * 1000, 2)
+
+
+def summarize(timings, queries, statuses, elapsed):
+    quantiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+    counted = [count for count in queries if count is not None]
+    return {
+        'requests': len(timings),
+        'errors': sum(1 for status in statuses if status >= 400),
+        'statuses': {str(status): statuses.count(status) for status in sorted(set(statuses))},
+        'throughput': round(len(timings) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': round(statistics.fmean(timings) * 1000, 2),
+            'p50': _percentile(quantiles, 50),
+            'p95': _percentile(quantiles, 95),
+            'p99': _percentile(quantiles, 99),
+            'max': round(max(timings) * 1000, 2),
+        },
+        'queries': {
+            'mean': round(statistics.fmean(counted), 2),
+            'p50': statistics.median(counted),
+            'max': max(counted),
+        } if counted else None,
+    }
+
+
+def run_scenario(scenario, make_client, requests=50, warmup=5):
+    client = make_client(scenario.user)
+    timings, queries, statuses = [], [], []
+    sent = 0
+    try:
+        for _ in range(warmup):
+            status, _ = client.request(scenario.method, scenario.url, scenario.request_data(sent))
+            sent += 1
+            # Timing error pages would benchmark the wrong thing
+            if not 200 <= status < 400:
+                raise BenchmarkError(f'{scenario.name}: warmup request to {scenario.url} returned {status}')
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            request_started = time.perf_counter()
+            status, query_count = client.request(scenario.method, scenario.url, scenario.request_data(sent))
+            timings.append(time.perf_counter() - request_started)
+            queries.append(query_count)
+            statuses.append(status)
+            sent += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        if scenario.teardown:
+            scenario.teardown(client, sent)
+    return summarize(timings, queries, statuses, elapsed)
+
+
+def run_benchmarks(scenarios, base_url=None, requests=50, warmup=5, on_result=None):
+    make_client = partial(HttpClient, base_url) if base_url else InProcessClient
+
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(scenario, make_client, requests, warmup)
+        if on_result:
+            on_result(scenario.name, results[scenario.name])
+    return {
+        'generated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'target': base_url or 'in-process',
+        'requests': requests,
+        'warmup': warmup,
+        'scenarios': results,
+    }
+
+
+def compare(results, baseline, tolerance=0.25, min_delta_ms=2.0):
+    """
+    Regressions against ``baseline``: failed requests, more queries at the
+    median, or a p95 latency more than ``tolerance`` (and ``min_delta_ms``)
+    above the baseline's. Scenarios missing from the baseline are skipped.
+    """
+    regressions = []
+    for name, result in results['scenarios'].items():
+        if result['errors']:
+            regressions.append(f"{name}: {result['errors']} failed requests {result['statuses']}")
+
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+
+        p95, base_p95 = result['latency_ms']['p95'], before['latency_ms']['p95']
+        if p95 > base_p95 * (1 + tolerance) and p95 - base_p95 > min_delta_ms:
+            regressions.append(f'{name}: p95 {p95}ms vs {base_p95}ms baseline')
+
+        if result['queries'] and before.get('queries'):
+            queries, base_queries = result['queries']['p50'], before['queries']['p50']
+            if queries > base_queries:
+                regressions.append(f'{name}: {queries} queries vs {base_queries} baseline')
+    return regressions
@@ -0,0 +1,11 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared_cache(alias=DEFAULT_CACHE_ALIAS):
+    """
+    Whether every worker process sees the same cache. Entries that other
+    processes must be able to invalidate only belong in a shared one: a
+    process-local cache keeps serving them after another process deletes them.
+    """
+    return not isinstance(caches[alias], LocMemCache)
@@ -1,24 +1,24 @@
 from django.conf import settings
-from notifications.models import Notification
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from .notification_summary import get_notification_summary
 
 def site_settings(request):
     return {
         'site_name': settings.SITE_NAME,
         'site_domain': settings.SITE_DOMAIN,
         'debug': settings.DEBUG,
+        'realtime_enabled': settings.REALTIME['enabled'],
+        'realtime_stream_url': settings.REALTIME['stream_url'],
+        'current_year': timezone.localdate().year,
     }
 
 def user_notifications(request):
     if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
-        recent_notifications = Notification.objects.filter(
-            user=request.user
-        ).order_by('-created_at')[:5]
+        # Nothing is fetched unless the template actually reads one of these
+        summary = SimpleLazyObject(lambda: get_notification_summary(request.user))
         return {
-            'unread_notifications': unread_count,
-            'recent_notifications': recent_notifications,
+            'unread_notifications': SimpleLazyObject(lambda: summary['unread']),
+            'recent_notifications': SimpleLazyObject(lambda: summary['recent']),
         }
-    return {}
\ No newline at end of file
+    return {}
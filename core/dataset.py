@@ -0,0 +1,606 @@
+import csv
+import datetime
+import hashlib
+import io
+import json
+import math
+import uuid
+from array import array
+from bisect import bisect
+from collections import Counter
+from itertools import accumulate
+from random import Random
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import LandlordProfile, StudentProfile, User
+from bookings.models import Booking, Inquiry
+from properties.geo import encode_geohash, haversine_km
+from properties.models import Amenity, FavoriteProperty, Property, PropertyImage
+from properties.search import update_search_vectors
+
+CHUNK_SIZE = 10000
+
+# name, city, state, zip code, latitude, longitude, relative demand, rent index
+UNIVERSITIES = (
+    ('University of Texas at Austin', 'Austin', 'TX', '78712', 30.2849, -97.7341, 10, 1.1),
+    ('University of Michigan', 'Ann Arbor', 'MI', '48109', 42.2780, -83.7382, 8, 1.0),
+    ('University of California, Berkeley', 'Berkeley', 'CA', '94720', 37.8719, -122.2585, 9, 1.8),
+    ('University of Washington', 'Seattle', 'WA', '98195', 47.6553, -122.3035, 8, 1.5),
+    ('Ohio State University', 'Columbus', 'OH', '43210', 40.0067, -83.0305, 9, 0.8),
+    ('University of Florida', 'Gainesville', 'FL', '32611', 29.6436, -82.3549, 7, 0.8),
+    ('Boston University', 'Boston', 'MA', '02215', 42.3505, -71.1054, 8, 1.7),
+    ('New York University', 'New York', 'NY', '10012', 40.7295, -73.9965, 10, 2.0),
+    ('University of Wisconsin-Madison', 'Madison', 'WI', '53706', 43.0766, -89.4125, 6, 0.9),
+    ('Arizona State University', 'Tempe', 'AZ', '85281', 33.4242, -111.9281, 7, 0.9),
+    ('University of Illinois Urbana-Champaign', 'Champaign', 'IL', '61820', 40.1020, -88.2272, 6, 0.7),
+    ('Georgia Institute of Technology', 'Atlanta', 'GA', '30332', 33.7756, -84.3963, 6, 1.1),
+)
+
+FIRST_NAMES = (
+    'Olivia', 'Liam', 'Emma', 'Noah', 'Ava', 'Mateo', 'Sophia', 'Lucas', 'Mia', 'Ethan',
+    'Amara', 'Wei', 'Priya', 'Diego', 'Fatima', 'Kenji', 'Chloe', 'Omar', 'Grace', 'Jonah',
+)
+LAST_NAMES = (
+    'Smith', 'Garcia', 'Nguyen', 'Johnson', 'Patel', 'Kim', 'Brown', 'Lopez', 'Chen', 'Davis',
+    'Okafor', 'Martinez', 'Wilson', 'Singh', 'Anderson', 'Rossi', 'Cohen', 'Taylor', 'Ali', 'Moore',
+)
+STREETS = ('Main', 'Oak', 'Maple', 'College', 'University', 'Park', 'Washington', 'Lake', 'Hill', 'Church', 'Elm', 'Pine')
+STREET_SUFFIXES = ('St', 'Ave', 'Blvd', 'Rd', 'Ln', 'Dr', 'Way')
+COMPANY_WORDS = ('Campus', 'College', 'Varsity', 'Scholar', 'Quad', 'Summit', 'Harbor', 'Maple', 'Ivy', 'Cardinal')
+COMPANY_SUFFIXES = ('Living', 'Properties', 'Housing', 'Rentals', 'Residences', 'Management')
+ADJECTIVES = ('Bright', 'Cozy', 'Spacious', 'Modern', 'Quiet', 'Renovated', 'Sunny', 'Charming', 'Affordable', 'Stylish')
+AMENITY_NAMES = (
+    'Bike storage', 'Study room', 'Rooftop terrace', 'Dishwasher', 'Air conditioning', 'Balcony',
+    'Package lockers', '24h security', 'Garden', 'Storage unit', 'Elevator', 'EV charging',
+)
+TRANSPORT = ('Bus stop 2 min walk', 'Light rail nearby', 'Bike lanes to campus', 'Campus shuttle', 'Walkable to campus')
+MESSAGES = (
+    'Hi, is the room still available for the dates above?',
+    'I am a graduate student looking for a quiet place to study.',
+    'Could I schedule a viewing next week?',
+    'Are utilities included in the rent?',
+    'I would be moving in with one friend from my program.',
+)
+
+# name: (weight, base rent, occupant range); base rent is scaled by the university's rent index
+ROOM_TYPES = {
+    'single': (30, 900, (1, 1)),
+    'double': (20, 650, (2, 2)),
+    'triple': (5, 500, (3, 3)),
+    'entire': (25, 1600, (1, 4)),
+    'shared': (20, 450, (2, 6)),
+}
+PROPERTY_TYPES = (('apartment', 40), ('house', 20), ('condo', 10), ('studio', 12), ('dorm', 8), ('shared', 10))
+IMAGE_POOL = 24
+
+# Leases cluster around the start of each semester
+MOVE_IN_MONTH_WEIGHTS = {1: 4, 2: 1, 3: 1, 4: 1, 5: 2, 6: 3, 7: 2, 8: 8, 9: 5, 10: 1, 11: 1, 12: 1}
+STAY_MONTHS = ((1, 3), (2, 2), (3, 4), (4, 8), (5, 9), (6, 6), (9, 8), (10, 6), (12, 10))
+MINIMUM_STAYS = ((1, 4), (3, 6), (4, 9), (6, 12), (12, 14))
+
+PAST_STATUSES = (('completed', 72), ('cancelled', 12), ('rejected', 16))
+CURRENT_STATUSES = (('approved', 92), ('cancelled', 8))
+FUTURE_STATUSES = (('pending', 30), ('approved', 50), ('rejected', 10), ('cancelled', 10))
+RECENT_INQUIRY_STATUSES = (('new', 60), ('contacted', 25), ('responded', 15))
+INQUIRY_STATUSES = (('new', 5), ('contacted', 15), ('responded', 55), ('closed', 25))
+
+
+def _copy_value(value):
+    if value is None:
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def write_rows(model, rows):
+    """
+    Insert ``rows`` (dicts keyed by field attname) in one statement: COPY on
+    PostgreSQL, ``bulk_create`` elsewhere. Missing columns take the field
+    default. Like ``bulk_create``, this skips ``save()`` and signals.
+    """
+    if connection.vendor != 'postgresql':
+        # bulk_create stamps auto_now/auto_now_add fields with the current time
+        model.objects.bulk_create([model(**row) for row in rows])
+        return
+
+    fields = [field for field in model._meta.concrete_fields if not field.db_returning]
+    now = timezone.now()
+    # (attname, default, whether the default is a callable to run per row)
+    columns = []
+    for field in fields:
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            columns.append((field.attname, now, False))
+        elif callable(field.default):
+            columns.append((field.attname, field.get_default, True))
+        else:
+            columns.append((field.attname, field.get_default(), False))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            _copy_value(row[attname] if attname in row else default() if per_row else default)
+            for attname, default, per_row in columns
+        ])
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    column_list = ', '.join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {quote(model._meta.db_table)} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+
+
+class DatasetGenerator:
+    """
+    Seeded synthetic data at production scale: students and landlords with
+    profiles, listings clustered around universities with images and
+    amenities, favorites, bookings and inquiries.
+
+    Rows are generated and written ``chunk_size`` at a time, one transaction
+    per chunk. Primary keys are derived from the seed and the row number, so
+    only a few compact arrays per user and property are kept between steps,
+    never the bookings themselves. Popularity follows heavy-tailed weights
+    (a few landlords, listings and students account for much of the
+    activity) and move-in dates peak before each semester.
+
+    Capacity is not enforced: approved stays may overlap beyond
+    ``maximum_occupants``, which only makes those listings look booked out.
+    """
+
+    def __init__(self, users=20000, landlord_share=0.1, properties=20000, bookings=1000000,
+                 inquiries=200000, favorites_per_student=3, images_per_property=3,
+                 seed=0, prefix='synthetic', password='password', chunk_size=CHUNK_SIZE, on_progress=None):
+        self.landlords = max(1, int(users * landlord_share))
+        self.students = max(1, users - self.landlords)
+        self.properties = properties
+        self.bookings = bookings
+        self.inquiries = inquiries
+        self.favorites_per_student = favorites_per_student
+        self.images_per_property = images_per_property
+        self.seed = seed
+        self.prefix = prefix
+        self.password = password
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.rng = Random(seed)
+        self.now = timezone.now()
+        self.today = timezone.localdate()
+
+    def run(self):
+        self.plan()
+        self.generate_users()
+        self.generate_properties()
+        self.generate_favorites()
+        self.generate_bookings()
+        self.generate_inquiries()
+
+    # Identity
+
+    def make_id(self, kind, index):
+        digest = hashlib.md5(f'{self.prefix}:{self.seed}:{kind}:{index}'.encode()).digest()
+        return uuid.UUID(bytes=digest, version=4)
+
+    def username(self, kind, index):
+        return f'{self.prefix}_{kind}_{index}'
+
+    # Helpers
+
+    def _chunks(self, total):
+        for start in range(0, total, self.chunk_size):
+            yield range(start, min(start + self.chunk_size, total))
+
+    def _progress(self, label, done, total):
+        if self.on_progress:
+            self.on_progress(label, done, total)
+
+    def _weighted(self, choices):
+        values = [value for value, weight in choices]
+        return values, list(accumulate(weight for value, weight in choices))
+
+    def _pick(self, values, cum_weights):
+        return values[bisect(cum_weights, self.rng.random() * cum_weights[-1])]
+
+    def _moment(self, not_before, not_after=None):
+        """A random aware datetime between two datetimes (default: now)."""
+        not_after = not_after or self.now
+        span = max((not_after - not_before).total_seconds(), 0)
+        return not_before + datetime.timedelta(seconds=self.rng.random() * span)
+
+    def _name(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def _street_address(self):
+        return f'{self.rng.randrange(1, 2400)} {self.rng.choice(STREETS)} {self.rng.choice(STREET_SUFFIXES)}'
+
+    # Plan
+
+    def plan(self):
+        rng = self.rng
+        self.university_weights = list(accumulate(u[6] for u in UNIVERSITIES))
+        universities = range(len(UNIVERSITIES))
+
+        # Pareto weights: a handful of agencies own a large share of listings
+        landlord_weights = list(accumulate(rng.paretovariate(1.16) for _ in range(self.landlords)))
+        self.landlord_university = bytearray(
+            self._pick(universities, self.university_weights) for _ in range(self.landlords)
+        )
+        self.property_landlord = array('l', (
+            bisect(landlord_weights, rng.random() * landlord_weights[-1]) for _ in range(self.properties)
+        ))
+        self.listing_counts = Counter(self.property_landlord)
+
+        self.student_university = bytearray(
+            self._pick(universities, self.university_weights) for _ in range(self.students)
+        )
+        self.student_activity = list(accumulate(rng.lognormvariate(0, 1) for _ in range(self.students)))
+
+        self.room_types, self.room_type_weights = self._weighted([(name, spec[0]) for name, spec in ROOM_TYPES.items()])
+        self.property_types, self.property_type_weights = self._weighted(PROPERTY_TYPES)
+        self.stay_months, self.stay_weights = self._weighted(STAY_MONTHS)
+        self.minimum_stays = self._weighted(MINIMUM_STAYS)
+        self.booking_statuses = [self._weighted(choices) for choices in (PAST_STATUSES, CURRENT_STATUSES, FUTURE_STATUSES)]
+        self.inquiry_statuses = [self._weighted(choices) for choices in (RECENT_INQUIRY_STATUSES, INQUIRY_STATUSES)]
+
+        month = self.today.replace(day=1) - relativedelta(months=24)
+        last_month = self.today.replace(day=1) + relativedelta(months=12)
+        move_in_months = []
+        while month <= last_month:
+            move_in_months.append((month, MOVE_IN_MONTH_WEIGHTS[month.month]))
+            month += relativedelta(months=1)
+        self.move_in_months, self.move_in_weights = self._weighted(move_in_months)
+
+    # Users
+
+    def generate_users(self):
+        password = make_password(self.password)
+        total = self.landlords + self.students
+        done = 0
+        for chunk in self._chunks(self.landlords):
+            users, profiles = [], []
+            for index in chunk:
+                user, profile = self._landlord(index, password)
+                users.append(user)
+                profiles.append(profile)
+            with transaction.atomic():
+                write_rows(User, users)
+                write_rows(LandlordProfile, profiles)
+            done += len(chunk)
+            self._progress('users', done, total)
+
+        for chunk in self._chunks(self.students):
+            users, profiles = [], []
+            for index in chunk:
+                user, profile = self._student(index, password)
+                users.append(user)
+                profiles.append(profile)
+            with transaction.atomic():
+                write_rows(User, users)
+                write_rows(StudentProfile, profiles)
+            done += len(chunk)
+            self._progress('users', done, total)
+
+    def _user(self, kind, index, password, joined_days):
+        rng = self.rng
+        first_name, last_name = self._name()
+        username = self.username(kind, index)
+        joined = self.now - datetime.timedelta(days=rng.random() * joined_days)
+        return {
+            'id': self.make_id(kind, index),
+            'password': password,
+            'username': username,
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': f'{username}@example.edu',
+            'user_type': kind,
+            'phone_number': f'555-{rng.randrange(10 ** 7):07d}',
+            'is_verified': rng.random() < 0.6,
+            'email_verified': rng.random() < 0.85,
+            'date_joined': joined,
+            'created_at': joined,
+            'updated_at': self._moment(joined),
+        }
+
+    def _landlord(self, index, password):
+        rng = self.rng
+        user = self._user('landlord', index, password, joined_days=5 * 365)
+        listings = self.listing_counts.get(index, 0)
+        company = f'{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}' if listings >= 5 else ''
+        university = UNIVERSITIES[self.landlord_university[index]]
+        verified = user['is_verified'] and listings > 0
+        profile = {
+            'user_id': user['id'],
+            'company_name': company,
+            'contact_person': f"{user['first_name']} {user['last_name']}",
+            'address': f'{self._street_address()}, {university[1]}, {university[2]} {university[3]}',
+            'tax_id': f'{rng.randrange(10 ** 8, 10 ** 9)}' if company else '',
+            'rating': round(rng.triangular(2.5, 5.0, 4.4), 1) if listings else 0,
+            'total_listings': listings,
+            'verified_since': user['date_joined'].date() if verified else None,
+        }
+        return user, profile
+
+    def _student(self, index, password):
+        rng = self.rng
+        user = self._user('student', index, password, joined_days=3 * 365)
+        university = UNIVERSITIES[self.student_university[index]]
+        user['university'] = university[0]
+        user['student_id'] = f'S{index:08d}'
+        budget = 700 * university[7]
+        move_in = None
+        if rng.random() < 0.7:
+            move_in = self.today.replace(day=1) + relativedelta(months=rng.randrange(1, 7))
+        profile = {
+            'user_id': user['id'],
+            'budget_min': round(budget * rng.uniform(0.5, 0.9)),
+            'budget_max': round(budget * rng.uniform(1.1, 1.8)),
+            'preferred_location': university[1],
+            'room_type_preference': self._pick(self.room_types, self.room_type_weights),
+            'move_in_date': move_in,
+            'special_requirements': '',
+        }
+        return user, profile
+
+    # Properties
+
+    def generate_properties(self):
+        rng = self.rng
+        self.property_price = array('l', bytes(8 * self.properties))
+        self.property_max_occupants = bytearray(self.properties)
+        self.property_min_stay = bytearray(self.properties)
+        self.property_university = bytearray(self.properties)
+        popularity = array('d', bytes(8 * self.properties))
+
+        for chunk in self._chunks(self.properties):
+            properties, images, amenities = [], [], []
+            for index in chunk:
+                row, weight = self._property(index)
+                properties.append(row)
+                popularity[index] = weight
+
+                image_count = round(rng.expovariate(1 / self.images_per_property)) if self.images_per_property else 0
+                for position in range(image_count):
+                    images.append({
+                        'property_id': row['id'],
+                        'image': f'property_images/synthetic/{rng.randrange(IMAGE_POOL):02d}.jpg',
+                        'is_primary': position == 0,
+                        'caption': '',
+                        'variants': {},
+                        'uploaded_at': row['created_at'] + datetime.timedelta(minutes=position),
+                    })
+                for name in rng.sample(AMENITY_NAMES, rng.randrange(0, 5)):
+                    amenities.append({'property_id': row['id'], 'name': name, 'description': ''})
+
+            with transaction.atomic():
+                write_rows(Property, properties)
+                write_rows(PropertyImage, images)
+                write_rows(Amenity, amenities)
+                if connection.vendor == 'postgresql':
+                    update_search_vectors(Property.objects.filter(pk__in=[row['id'] for row in properties]))
+            self._progress('properties', chunk.stop, self.properties)
+
+        # Per-university popularity, so students mostly pick listings near their campus
+        by_university = [[] for _ in UNIVERSITIES]
+        for index in range(self.properties):
+            by_university[self.property_university[index]].append(index)
+        self.university_properties = [
+            (indexes, list(accumulate(popularity[index] for index in indexes)))
+            for indexes in by_university
+        ]
+        self.all_properties = (range(self.properties), list(accumulate(popularity)))
+
+    def _property(self, index):
+        rng = self.rng
+        landlord = self.property_landlord[index]
+        university_index = self.landlord_university[landlord]
+        if rng.random() < 0.1:
+            university_index = self._pick(range(len(UNIVERSITIES)), self.university_weights)
+        name, city, state, zip_code, latitude, longitude, demand, rent_index = UNIVERSITIES[university_index]
+
+        # Listings thin out with distance from campus (mean ~2.5 km)
+        distance = rng.expovariate(1 / 2.5)
+        bearing = rng.uniform(0, 2 * math.pi)
+        lat = latitude + distance / 111.32 * math.cos(bearing)
+        lng = longitude + distance / (111.32 * math.cos(math.radians(latitude))) * math.sin(bearing)
+        lat, lng = round(lat, 6), round(lng, 6)
+
+        room_type = self._pick(self.room_types, self.room_type_weights)
+        base_rent, (min_occupants, max_occupants) = ROOM_TYPES[room_type][1:]
+        property_type = 'studio' if room_type == 'single' and rng.random() < 0.3 else self._pick(
+            self.property_types, self.property_type_weights)
+        bedrooms = rng.randint(1, 4) if room_type == 'entire' else rng.randint(max(1, min_occupants - 1), 6)
+        occupants = rng.randint(min_occupants, max_occupants)
+        if room_type == 'entire':
+            occupants = rng.randint(bedrooms, bedrooms + 1)
+        # Closer to campus costs more
+        price = base_rent * rent_index * rng.lognormvariate(0, 0.25) * (1.15 - min(distance, 10) / 40)
+        price = max(150, int(round(price / 5) * 5))
+        min_stay = self._pick(*self.minimum_stays)
+
+        created_at = self.now - datetime.timedelta(days=rng.random() * 3 * 365)
+        verified = rng.random() < 0.7
+        furnished = rng.random() < 0.55
+        utilities = rng.random() < 0.4
+
+        self.property_price[index] = price
+        self.property_max_occupants[index] = occupants
+        self.property_min_stay[index] = min_stay
+        self.property_university[index] = university_index
+
+        adjective = rng.choice(ADJECTIVES)
+        label = dict(Property.ROOM_TYPE_CHOICES)[room_type].lower()
+        row = {
+            'id': self.make_id('property', index),
+            'landlord_id': self.make_id('landlord', landlord),
+            'title': f'{adjective} {label} near {name}',
+            'description': (
+                f'{adjective} {label} in a {property_type} {distance:.1f} km from {name}. '
+                f"{'Furnished, ' if furnished else 'Unfurnished, '}"
+                f"{'utilities included.' if utilities else 'utilities billed separately.'} "
+                f'Ideal for students in {city}.'
+            ),
+            'property_type': property_type,
+            'room_type': room_type,
+            'address': self._street_address(),
+            'city': city,
+            'state': state,
+            'zip_code': zip_code,
+            'country': 'US',
+            'latitude': lat,
+            'longitude': lng,
+            'geohash': encode_geohash(lat, lng),
+            'price_per_month': price,
+            'security_deposit': price if rng.random() < 0.8 else 0,
+            'utilities_included': utilities,
+            'wifi_included': utilities or rng.random() < 0.5,
+            'bedrooms': bedrooms,
+            'bathrooms': rng.choice(('1.0', '1.0', '1.5', '2.0', '2.5')),
+            'area_sqft': rng.randint(120, 260) if room_type != 'entire' else rng.randint(350, 400 * bedrooms + 300),
+            'furnished': furnished,
+            'has_kitchen': property_type != 'dorm' or rng.random() < 0.3,
+            'has_laundry': rng.random() < 0.6,
+            'has_parking': rng.random() < 0.45,
+            'has_gym': rng.random() < 0.2,
+            'has_pool': rng.random() < 0.1,
+            'pet_friendly': rng.random() < 0.25,
+            'smoking_allowed': rng.random() < 0.05,
+            'nearest_university': name,
+            'distance_to_university': round(haversine_km(lat, lng, latitude, longitude), 2),
+            'transport_options': rng.choice(TRANSPORT),
+            'available_from': self.today + datetime.timedelta(days=rng.randint(-60, 180)),
+            'available_to': None,
+            'minimum_stay_months': min_stay,
+            'maximum_occupants': occupants,
+            'is_verified': verified,
+            'is_active': rng.random() < 0.93,
+            'verification_notes': '',
+            'verified_at': self._moment(created_at) if verified else None,
+            'favorite_count': 0,
+            'created_at': created_at,
+            'updated_at': self._moment(created_at),
+        }
+        weight = rng.lognormvariate(0, 1) * (1.3 if verified else 1.0) * demand / 10
+        row['view_count'] = int(weight * rng.uniform(20, 400))
+        return row, weight
+
+    def _property_for(self, student):
+        """A listing for ``student``: usually near their campus, weighted by popularity."""
+        indexes, weights = self.university_properties[self.student_university[student]]
+        if not indexes or self.rng.random() < 0.15:
+            indexes, weights = self.all_properties
+        return self._pick(indexes, weights)
+
+    def _active_student(self):
+        return self._pick(range(self.students), self.student_activity)
+
+    # Activity
+
+    def generate_favorites(self):
+        rng = self.rng
+        if not self.favorites_per_student:
+            return
+        for chunk in self._chunks(self.students):
+            rows = []
+            for student in chunk:
+                count = min(int(rng.expovariate(1 / self.favorites_per_student)), self.properties)
+                picked = set()
+                for attempt in range(count * 3):
+                    if len(picked) >= count:
+                        break
+                    picked.add(self._property_for(student))
+                student_id = self.make_id('student', student)
+                rows.extend({
+                    'user_id': student_id,
+                    'property_id': self.make_id('property', index),
+                    'created_at': self.now - datetime.timedelta(days=rng.random() * 365),
+                } for index in picked)
+            with transaction.atomic():
+                write_rows(FavoriteProperty, rows)
+            self._progress('favorites', chunk.stop, self.students)
+
+    def generate_bookings(self):
+        for chunk in self._chunks(self.bookings):
+            rows = [self._booking(index) for index in chunk]
+            with transaction.atomic():
+                write_rows(Booking, rows)
+            self._progress('bookings', chunk.stop, self.bookings)
+
+    def _booking(self, index):
+        rng = self.rng
+        student = self._active_student()
+        prop = self._property_for(student)
+
+        month = self._pick(self.move_in_months, self.move_in_weights)
+        check_in = month + datetime.timedelta(days=0 if rng.random() < 0.4 else rng.randrange(28))
+        months = max(self._pick(self.stay_months, self.stay_weights), self.property_min_stay[prop])
+        check_out = check_in + relativedelta(months=months)
+
+        past, current, future = self.booking_statuses
+        if check_out <= self.today:
+            status = self._pick(*past)
+        elif check_in <= self.today:
+            status = self._pick(*current)
+        else:
+            status = self._pick(*future)
+
+        # Requests go in a few days to a few months ahead of the move-in date
+        lead_days = int(rng.expovariate(1 / 45)) + 1
+        booked_at = self.now - datetime.timedelta(
+            days=max((self.today - check_in).days + lead_days, 0), seconds=rng.randrange(86400))
+        decided_at = min(booked_at + datetime.timedelta(hours=rng.uniform(1, 72)), self.now)
+        paid = status in ('approved', 'completed')
+        price = self.property_price[prop]
+
+        occupants = 1 + (rng.random() < 0.2) + (rng.random() < 0.05)
+        return {
+            'id': self.make_id('booking', index),
+            'student_id': self.make_id('student', student),
+            'property_id': self.make_id('property', prop),
+            'landlord_id': self.make_id('landlord', self.property_landlord[prop]),
+            'check_in_date': check_in,
+            'check_out_date': check_out,
+            'number_of_occupants': min(occupants, self.property_max_occupants[prop]),
+            'total_price': price * months,
+            'security_deposit_paid': price if paid else 0,
+            'student_message': rng.choice(MESSAGES) if rng.random() < 0.5 else '',
+            'status': status,
+            'booked_at': booked_at,
+            'approved_at': decided_at if paid else None,
+            'cancelled_at': decided_at if status == 'cancelled' else None,
+            'completed_at': (
+                datetime.datetime.combine(check_out, datetime.time(12), tzinfo=datetime.timezone.utc)
+                if status == 'completed' else None
+            ),
+            'payment_status': 'paid' if paid else 'refunded' if status == 'cancelled' and rng.random() < 0.5 else 'pending',
+        }
+
+    def generate_inquiries(self):
+        for chunk in self._chunks(self.inquiries):
+            rows = [self._inquiry(index) for index in chunk]
+            with transaction.atomic():
+                write_rows(Inquiry, rows)
+            self._progress('inquiries', chunk.stop, self.inquiries)
+
+    def _inquiry(self, index):
+        rng = self.rng
+        student = self._active_student()
+        age = datetime.timedelta(days=rng.random() * 730)
+        created_at = self.now - age
+        recent, settled = self.inquiry_statuses
+        status = self._pick(*(recent if age.days < 14 else settled))
+        return {
+            'id': self.make_id('inquiry', index),
+            'property_id': self.make_id('property', self._property_for(student)),
+            'student_id': self.make_id('student', student),
+            'message': rng.choice(MESSAGES),
+            'status': status,
+            'created_at': created_at,
+            'updated_at': created_at if status == 'new' else self._moment(created_at),
+        }
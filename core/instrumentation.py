@@ -0,0 +1,223 @@
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_stats', default=None)
+_render_depth = contextvars.ContextVar('template_render_depth', default=0)
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\bIN \((?:\s*(?:\?|%s)\s*,?)+\)', re.IGNORECASE), 'IN (...)'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def fingerprint(sql):
+    """SQL with literals and placeholders collapsed, so repeats of one query shape group together."""
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def current_stats():
+    return _current.get()
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.fingerprints = Counter()
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold=2):
+        return {sql: count for sql, count in self.fingerprints.items() if count >= threshold}
+
+
+def _timed_render(render):
+    def wrapper(*args, **kwargs):
+        stats = _current.get()
+        depth = _render_depth.get()
+        if stats is None or depth:
+            # Includes and nested templates count towards the outermost render
+            token = _render_depth.set(depth + 1)
+            try:
+                return render(*args, **kwargs)
+            finally:
+                _render_depth.reset(token)
+
+        token = _render_depth.set(1)
+        started = time.perf_counter()
+        try:
+            return render(*args, **kwargs)
+        finally:
+            stats.template_time += time.perf_counter() - started
+            _render_depth.reset(token)
+    wrapper.__wrapped__ = render
+    return wrapper
+
+
+_installed = False
+
+
+def install_template_timing():
+    """Time Django and Jinja template rendering for the request being instrumented."""
+    global _installed
+    if _installed:
+        return
+    from django.template.base import Template
+    Template.render = _timed_render(Template.render)
+    try:
+        import jinja2
+    except ImportError:
+        pass
+    else:
+        jinja2.Template.render = _timed_render(jinja2.Template.render)
+    _installed = True
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self):
+        labels = [str(bound) for bound in self.buckets] + ['+Inf']
+        return {
+            'count': self.total,
+            'sum': round(self.sum, 6),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class ViewStatistics:
+    """In-process histograms per URL name, for when debug headers are off."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(self._new_view)
+
+    @staticmethod
+    def _new_view():
+        return {
+            'request_time': Histogram(TIME_BUCKETS),
+            'sql_time': Histogram(TIME_BUCKETS),
+            'template_time': Histogram(TIME_BUCKETS),
+            'queries': Histogram(QUERY_BUCKETS),
+            'duplicates': Counter(),
+        }
+
+    def observe(self, view_name, stats, request_time, duplicates):
+        with self._lock:
+            view = self._views[view_name]
+            view['request_time'].observe(request_time)
+            view['sql_time'].observe(stats.sql_time)
+            view['template_time'].observe(stats.template_time)
+            view['queries'].observe(stats.queries)
+            view['duplicates'].update(duplicates.keys())
+
+    def snapshot(self, top_duplicates=5):
+        with self._lock:
+            return {
+                name: {
+                    **{metric: view[metric].snapshot() for metric in ('request_time', 'sql_time', 'template_time', 'queries')},
+                    # Query shapes most often repeated within a single request: likely N+1s
+                    'repeated_queries': view['duplicates'].most_common(top_duplicates),
+                }
+                for name, view in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+view_statistics = ViewStatistics()
+
+
+def view_name_for(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match and match.view_name else 'unresolved'
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Counts and times SQL and template rendering for each request and flags
+    query shapes repeated N+1-style. With INSTRUMENTATION['headers'] the
+    numbers are returned as X-* response headers; otherwise they feed the
+    per-view histograms in ``view_statistics``. Every request is also
+    recorded in the Prometheus metrics of ``core.metrics``.
+    """
+
+    def __init__(self, get_response):
+        from . import metrics
+        self.get_response = get_response
+        self.metrics = metrics
+        install_template_timing()
+
+    def __call__(self, request):
+        config = settings.INSTRUMENTATION
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats.record_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        request_time = time.perf_counter() - started
+
+        view_name = view_name_for(request)
+        self.metrics.observe_request(view_name, request.method, response.status_code, request_time, stats)
+        duplicates = stats.duplicates(config['n_plus_one_threshold'])
+        for sql, count in duplicates.items():
+            logger.warning('Possible N+1 in %s: %d x %s', view_name, count, sql)
+
+        if config['headers']:
+            response['X-Request-Time-Ms'] = f'{request_time * 1000:.1f}'
+            response['X-Query-Count'] = str(stats.queries)
+            response['X-Query-Time-Ms'] = f'{stats.sql_time * 1000:.1f}'
+            response['X-Template-Time-Ms'] = f'{stats.template_time * 1000:.1f}'
+            response['X-Duplicate-Queries'] = str(sum(count - 1 for count in stats.fingerprints.values()))
+            if duplicates:
+                response['X-N-Plus-One'] = str(len(duplicates))
+        else:
+            view_statistics.observe(view_name, stats, request_time, duplicates)
+        return response
@@ -0,0 +1,104 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmark import BenchmarkError, build_scenarios, compare, default_fixtures, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the hot endpoints (search, detail, dashboards, bookings, favorites) and report '
+            'throughput, latency percentiles and query counts, optionally against a stored baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario first')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Run only this scenario (repeatable)')
+        parser.add_argument('--list', action='store_true', help='List the scenarios and exit')
+        parser.add_argument('--base-url',
+                            help='Benchmark a running server sharing this database instead of in-process')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Overwrite --baseline with these results instead of comparing')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative p95 slowdown before a scenario counts as a regression')
+        parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                            help='Ignore p95 slowdowns smaller than this many milliseconds')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1.')
+        if options['update_baseline'] and not options['baseline']:
+            raise CommandError('--update-baseline needs --baseline.')
+
+        fixtures = default_fixtures()
+        missing = [name for name in ('student', 'landlord', 'property') if fixtures[name] is None]
+        if missing:
+            raise CommandError(f"No {', '.join(missing)} to benchmark with; run generate_dataset first.")
+
+        scenarios = build_scenarios(fixtures)
+        if options['list']:
+            for scenario in scenarios:
+                self.stdout.write(f'{scenario.name}: {scenario.method} {scenario.url}')
+            return
+
+        if options['scenarios']:
+            unknown = set(options['scenarios']) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['scenarios']]
+
+        self.stdout.write(
+            f"{'scenario':<28}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}"
+        )
+
+        def report(name, result):
+            latency = result['latency_ms']
+            queries = result['queries']['p50'] if result['queries'] else '-'
+            self.stdout.write(
+                f"{name:<28}{result['throughput']:>9}{latency['p50']:>9}{latency['p95']:>9}"
+                f"{latency['p99']:>9}{queries:>9}{result['errors']:>8}"
+            )
+
+        try:
+            results = run_benchmarks(
+                scenarios,
+                base_url=options['base_url'],
+                requests=options['requests'],
+                warmup=options['warmup'],
+                on_result=report,
+            )
+        except BenchmarkError as exc:
+            raise CommandError(str(exc))
+
+        if options['output']:
+            self._write(options['output'], results)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['update_baseline']:
+            self._write(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline updated: {options['baseline']}"))
+            return
+
+        baseline = {}
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not read baseline {options['baseline']}: {exc}")
+
+        regressions = compare(results, baseline, options['tolerance'], options['min_delta_ms'])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f'{len(regressions)} performance regressions.')
+        self.stdout.write(self.style.SUCCESS(
+            'No regressions against the baseline.' if baseline else 'All scenarios completed without errors.'
+        ))
+
+    def _write(self, path, results):
+        try:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        except OSError as exc:
+            raise CommandError(str(exc))
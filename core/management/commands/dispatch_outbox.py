@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from core.outbox import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending outbox events (notifications, email) in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling instead of exiting once the outbox is drained')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to wait between polls when idle (with --loop)')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = dispatch_pending(options['batch_size'])
+            if processed:
+                self.stdout.write(f'Dispatched {processed} outbox events')
+            if not options['loop']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
@@ -0,0 +1,74 @@
+import time
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from core.dataset import CHUNK_SIZE, DatasetGenerator
+from core.page_cache import LISTINGS_TAG, invalidate_tags
+from core.stats import recompute_site_stats
+
+
+class Command(BaseCommand):
+    help = ('Populate the database with seeded synthetic users, listings, favorites, bookings '
+            'and inquiries for load testing (COPY on PostgreSQL, bulk_create elsewhere)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--landlord-share', type=float, default=0.1,
+                            help='Fraction of the users that are landlords')
+        parser.add_argument('--properties', type=int, default=20000)
+        parser.add_argument('--bookings', type=int, default=1000000)
+        parser.add_argument('--inquiries', type=int, default=200000)
+        parser.add_argument('--favorites-per-student', type=float, default=3,
+                            help='Mean favorites per student (exponentially distributed)')
+        parser.add_argument('--images-per-property', type=float, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='synthetic',
+                            help='Username prefix; also separates the ids of different runs')
+        parser.add_argument('--password', default='password', help='Password for every generated user')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['properties'] < 1:
+            raise CommandError('Generate at least two users and one property.')
+        if not 0 < options['landlord_share'] < 1:
+            raise CommandError('--landlord-share must be between 0 and 1.')
+        if User.objects.filter(username__startswith=f"{options['prefix']}_").exists():
+            raise CommandError(f"Users prefixed {options['prefix']}_ already exist; pick another --prefix.")
+
+        started = time.perf_counter()
+        reported = {}
+
+        def report_progress(label, done, total):
+            # Roughly every tenth of each step
+            step = max(total // 10, 1)
+            if done == total or done // step != reported.get(label, 0) // step:
+                self.stdout.write(f'{label}: {done}/{total} ({time.perf_counter() - started:.0f}s)')
+            reported[label] = done
+
+        generator = DatasetGenerator(
+            users=options['users'],
+            landlord_share=options['landlord_share'],
+            properties=options['properties'],
+            bookings=options['bookings'],
+            inquiries=options['inquiries'],
+            favorites_per_student=options['favorites_per_student'],
+            images_per_property=options['images_per_property'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            password=options['password'],
+            chunk_size=options['chunk_size'],
+            on_progress=report_progress,
+        )
+        generator.run()
+
+        # Rows went in without save() or signals; rebuild what those maintain
+        call_command('reconcile_favorite_counts', stdout=self.stdout)
+        recompute_site_stats()
+        invalidate_tags(LISTINGS_TAG)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {generator.landlords} landlords, {generator.students} students, '
+            f"{options['properties']} properties, {options['bookings']} bookings and "
+            f"{options['inquiries']} inquiries in {time.perf_counter() - started:.0f}s"
+        ))
+        self.stdout.write('Run rebuild_similar_properties to score similar listings for the new data.')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from core.stats import recompute_site_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized site statistics from the properties table'
+
+    def handle(self, *args, **options):
+        stats = recompute_site_stats()
+        for key, value in stats.items():
+            self.stdout.write(f'{key}: {value}')
+        self.stdout.write(self.style.SUCCESS('Site statistics recomputed'))
@@ -0,0 +1,68 @@
+import os
+import time
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from .instrumentation import QUERY_BUCKETS, TIME_BUCKETS
+
+# With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py) every worker writes
+# its samples to files there and a scrape of any worker reports the sum.
+
+REQUEST_LATENCY = Histogram(
+    'django_http_request_duration_seconds', 'Request latency by URL name',
+    ['view', 'method'], buckets=TIME_BUCKETS,
+)
+RESPONSES = Counter(
+    'django_http_responses', 'Responses by URL name and status code',
+    ['view', 'method', 'status'],
+)
+DB_TIME = Histogram(
+    'django_db_time_per_request_seconds', 'Time spent in SQL per request',
+    ['view'], buckets=TIME_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'django_db_queries_per_request', 'SQL queries per request',
+    ['view'], buckets=QUERY_BUCKETS,
+)
+TEMPLATE_TIME = Histogram(
+    'django_template_time_per_request_seconds', 'Template rendering time per request',
+    ['view'], buckets=TIME_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    'django_cache_lookups', 'Application cache lookups by cache and result',
+    ['cache', 'result'],
+)
+CACHE_LATENCY = Histogram(
+    'django_cache_lookup_duration_seconds', 'Application cache lookup latency',
+    ['cache'], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+
+def observe_request(view_name, method, status, request_time, stats):
+    REQUEST_LATENCY.labels(view_name, method).observe(request_time)
+    RESPONSES.labels(view_name, method, str(status)).inc()
+    DB_TIME.labels(view_name).observe(stats.sql_time)
+    DB_QUERIES.labels(view_name).observe(stats.queries)
+    TEMPLATE_TIME.labels(view_name).observe(stats.template_time)
+
+
+def record_cache_lookup(cache_name, hit, duration=None):
+    CACHE_LOOKUPS.labels(cache_name, 'hit' if hit else 'miss').inc()
+    if duration is not None:
+        CACHE_LATENCY.labels(cache_name).observe(duration)
+
+
+def timed_cache_get(cache, key, cache_name):
+    """``cache.get(key)``, recording the lookup as a hit or miss for ``cache_name``."""
+    started = time.perf_counter()
+    value = cache.get(key)
+    record_cache_lookup(cache_name, value is not None, time.perf_counter() - started)
+    return value
+
+
+def render_metrics():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.db import transaction
+from .caching import is_shared_cache
+from .metrics import timed_cache_get
+
+CACHE_KEY = 'core:notification_summary:{}'
+# Safety net for changes that bypass the signals, such as queryset.update()
+CACHE_TIMEOUT = 300
+# A process-local cache never hears about invalidations from other processes,
+# so its copies may only be this stale
+LOCAL_CACHE_TIMEOUT = 15
+RECENT_LIMIT = 5
+
+
+def get_notification_summary(user):
+    """
+    Unread count and most recent notifications for ``user``, cached per user.
+    The outbox dispatcher that invalidates it runs in another process, so
+    with a process-local cache the copy only lives for LOCAL_CACHE_TIMEOUT.
+    """
+    key = CACHE_KEY.format(user.pk)
+    summary = timed_cache_get(cache, key, 'notification_summary')
+    if summary is None:
+        from notifications.models import Notification
+        notifications = Notification.objects.filter(user=user)
+        summary = {
+            'unread': notifications.filter(is_read=False).count(),
+            'recent': list(notifications.order_by('-created_at')[:RECENT_LIMIT]),
+        }
+        cache.set(key, summary, CACHE_TIMEOUT if is_shared_cache() else LOCAL_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_notification_summary(*user_ids):
+    keys = [CACHE_KEY.format(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
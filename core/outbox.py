@@ -0,0 +1,237 @@
+import datetime
+import logging
+import uuid
+from collections import defaultdict
+from contextlib import nullcontext
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboxEvent
+from .notification_summary import invalidate_notification_summary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNELS = ('in_app', 'email', 'realtime')
+
+# channel name -> handler(events) returning {event_id: error} for the ones that failed
+CHANNELS = {}
+# Channels that only write to this database; see ``channel``
+TRANSACTIONAL_CHANNELS = set()
+
+
+def channel(name, transactional=False):
+    """
+    Register a delivery handler. A ``transactional`` handler runs inside the
+    transaction that marks its events sent, so it delivers exactly once; the
+    others run outside any transaction and are at-least-once.
+    """
+    def register(handler):
+        CHANNELS[name] = handler
+        if transactional:
+            TRANSACTIONAL_CHANNELS.add(name)
+        return handler
+    return register
+
+
+def publish(event_type, recipient, title, message, data=None, dedupe_key=None, channels=DEFAULT_CHANNELS):
+    """
+    Record a notification for delivery on each channel. Call it inside the
+    transaction that makes the change, so the event exists if and only if
+    the change commits. Publishing the same ``dedupe_key`` twice is a no-op.
+    """
+    dedupe_key = dedupe_key or uuid.uuid4().hex
+    payload = {
+        'notification_type': event_type,
+        'title': title,
+        'message': message,
+        'data': data or {},
+    }
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(
+            channel=name,
+            event_type=event_type,
+            recipient=recipient,
+            payload=payload,
+            dedupe_key=f'{dedupe_key}:{name}',
+        )
+        for name in channels
+    ], ignore_conflicts=True)
+    transaction.on_commit(_wake_dispatcher)
+
+
+def _wake_dispatcher():
+    # Eager mode (local development) has no worker or beat, so send inline
+    if settings.CELERY_TASK_ALWAYS_EAGER:
+        dispatch_pending()
+        return
+    # Best effort: the periodic dispatcher picks the events up anyway
+    from kombu.exceptions import OperationalError
+    from .tasks import dispatch_outbox_task
+    try:
+        dispatch_outbox_task.delay()
+    except OperationalError:
+        logger.warning('Outbox dispatcher could not be woken; events wait for the next run')
+
+
+def retry_delay(attempts):
+    return datetime.timedelta(seconds=settings.OUTBOX['retry_backoff'] * 2 ** (attempts - 1))
+
+
+def _claim(batch_size, now):
+    # Due events, and in-flight ones whose dispatcher died before recording them
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(status__in=('pending', 'sending'), next_attempt_at__lte=now)
+            .select_related('recipient')
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        # The lease expiry doubles as this claim's token when recording results
+        lease = now + datetime.timedelta(seconds=settings.OUTBOX['claim_timeout'])
+        for event in events:
+            event.status = 'sending'
+            event.next_attempt_at = lease
+        OutboxEvent.objects.bulk_update(events, ['status', 'next_attempt_at'])
+    return events
+
+
+def _deliver(name, channel_events, savepoint=False):
+    handler = CHANNELS.get(name)
+    if handler is None:
+        return {event.pk: f'Unknown channel {name!r}' for event in channel_events}
+    try:
+        # Savepoint: a failing transactional channel must not abort recording the batch
+        with transaction.atomic() if savepoint else nullcontext():
+            return handler(channel_events)
+    except Exception as e:
+        logger.exception('Outbox channel %s failed', name)
+        return {event.pk: repr(e) for event in channel_events}
+
+
+def dispatch_batch(batch_size=None):
+    """
+    Deliver one batch of due events; returns how many were processed.
+
+    Rows are claimed with SKIP LOCKED and marked in flight in a short
+    transaction, so any number of dispatchers can run side by side without
+    holding locks while they talk to mail servers. Results are recorded in
+    a second short transaction; an event whose dispatcher dies in between
+    is claimed again once OUTBOX['claim_timeout'] passes.
+    """
+    batch_size = batch_size or settings.OUTBOX['batch_size']
+    now = timezone.now()
+    events = _claim(batch_size, now)
+    claimed = len(events)
+    if not claimed:
+        return 0
+
+    by_channel = defaultdict(list)
+    for event in events:
+        by_channel[event.channel].append(event)
+
+    errors = {}
+    for name, channel_events in by_channel.items():
+        if name not in TRANSACTIONAL_CHANNELS:
+            errors.update(_deliver(name, channel_events))
+
+    with transaction.atomic():
+        # Skip events whose lease ran out and that another dispatcher has claimed since
+        owned = set(
+            OutboxEvent.objects.select_for_update()
+            .filter(pk__in=[event.pk for event in events], status='sending',
+                    next_attempt_at=events[0].next_attempt_at)
+            .values_list('pk', flat=True)
+        )
+        events = [event for event in events if event.pk in owned]
+
+        for name in TRANSACTIONAL_CHANNELS & by_channel.keys():
+            channel_events = [event for event in by_channel[name] if event.pk in owned]
+            if channel_events:
+                errors.update(_deliver(name, channel_events, savepoint=True))
+
+        finished = timezone.now()
+        for event in events:
+            event.attempts += 1
+            if event.pk not in errors:
+                event.status = 'sent'
+                event.sent_at = finished
+                event.last_error = ''
+            elif event.attempts >= settings.OUTBOX['max_attempts'] or event.channel not in CHANNELS:
+                event.status = 'failed'
+                event.last_error = errors[event.pk]
+            else:
+                event.status = 'pending'
+                event.next_attempt_at = finished + retry_delay(event.attempts)
+                event.last_error = errors[event.pk]
+        OutboxEvent.objects.bulk_update(events, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+
+    return claimed
+
+
+def dispatch_pending(batch_size=None, max_batches=None):
+    """Drain due events batch by batch; returns the number processed."""
+    processed = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = dispatch_batch(batch_size)
+        if not count:
+            break
+        processed += count
+        batches += 1
+    return processed
+
+
+def purge_sent_events(older_than=datetime.timedelta(days=7)):
+    deleted, _ = OutboxEvent.objects.filter(status='sent', sent_at__lt=timezone.now() - older_than).delete()
+    return deleted
+
+
+@channel('in_app', transactional=True)
+def deliver_in_app(events):
+    from notifications.models import Notification
+    Notification.objects.bulk_create([
+        Notification(
+            user=event.recipient,
+            notification_type=event.payload['notification_type'],
+            title=event.payload['title'],
+            message=event.payload['message'],
+            data=event.payload['data'],
+        )
+        for event in events
+    ])
+    # bulk_create skips post_save, so refresh the cached badges here
+    invalidate_notification_summary(*{event.recipient_id for event in events})
+    return {}
+
+
+@channel('email')
+def deliver_email(events):
+    errors = {}
+    # One SMTP connection for the whole batch
+    with get_connection(fail_silently=False) as connection:
+        for event in events:
+            if not event.recipient.email:
+                continue
+            email = EmailMessage(
+                subject=event.payload['title'],
+                body=event.payload['message'],
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[event.recipient.email],
+                connection=connection,
+            )
+            try:
+                email.send()
+            except Exception as e:
+                errors[event.pk] = repr(e)
+    return errors
+
+
+@channel('realtime')
+def deliver_realtime(events):
+    from .realtime import publish_to_user
+    if not settings.REALTIME['enabled']:
+        # No streams are served, so there is nobody to publish to
+        return {}
+    for event in events:
+        publish_to_user(event.recipient_id, 'notification', {'id': event.pk, **event.payload})
+    return {}
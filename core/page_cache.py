@@ -0,0 +1,125 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from .metrics import record_cache_lookup, timed_cache_get
+
+TAG_KEY = 'page_cache:tag:{}'
+PAGE_KEY = 'page_cache:page:{}'
+
+# Every page that lists properties (home, search, similar listings on detail pages)
+LISTINGS_TAG = 'listings'
+# Searches narrowed to a stay, whose results depend on approved bookings
+AVAILABILITY_TAG = 'availability'
+
+
+def property_tag(property_id):
+    return f'property:{property_id}'
+
+
+def get_tag_versions(tags):
+    """
+    Version (a unix timestamp) of each tag; unknown tags start now.
+
+    Versions expire with the pages stored under them. A process-local cache
+    never sees another process's invalidation, so this bounds how long it
+    can keep serving pages the other process has invalidated.
+    """
+    keys = {tag: TAG_KEY.format(tag) for tag in tags}
+    stored = cache.get_many(keys.values())
+    versions = {}
+    for tag, key in keys.items():
+        if key not in stored:
+            cache.add(key, time.time(), settings.PAGE_CACHE_TIMEOUT)
+            stored[key] = cache.get(key) or time.time()
+        versions[tag] = stored[key]
+    return versions
+
+
+def invalidate_tags(*tags):
+    """Give the tags a new version once the transaction commits; pages cached under the old one are never served again."""
+    def bump():
+        now = time.time()
+        cache.set_many({TAG_KEY.format(tag): now for tag in tags}, settings.PAGE_CACHE_TIMEOUT)
+    transaction.on_commit(bump)
+
+
+def is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    # Pending flash messages are rendered into the page
+    if 'messages' in request.COOKIES or request.session.get('_messages'):
+        return False
+    return True
+
+
+def is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+class AnonymousPageCacheMixin:
+    """
+    Whole-page caching and conditional GET for anonymous visitors.
+
+    Pages are stored under the versions of ``get_page_cache_tags()``; the
+    ETag and Last-Modified headers come from the same versions, so a 304 or
+    a cached copy is answered without touching the view. Signed-in users,
+    pending messages and pages that issue a CSRF cookie bypass the cache.
+    """
+
+    def get_page_cache_tags(self):
+        return [LISTINGS_TAG]
+
+    def page_cache_hit(self):
+        """Hook for side effects that must run even when the view is skipped."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        versions = get_tag_versions(self.get_page_cache_tags())
+        signature = hashlib.md5(
+            f'{request.get_full_path()}|{sorted(versions.items())}'.encode()
+        ).hexdigest()
+        etag = f'"{signature}"'
+        last_modified = int(max(versions.values()))
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            record_cache_lookup('page', True)
+            self.page_cache_hit()
+            return self._add_validators(not_modified, etag, last_modified)
+
+        key = PAGE_KEY.format(signature)
+        response = timed_cache_get(cache, key, 'page')
+        if response is not None:
+            self.page_cache_hit()
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        if not is_cacheable_response(request, response):
+            return response
+
+        self._add_validators(response, etag, last_modified)
+        cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+        return response
+
+    @staticmethod
+    def _add_validators(response, etag, last_modified):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Browsers revalidate every time; signed-in users (other cookies) never share these copies
+        patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+        patch_vary_headers(response, ['Cookie'])
+        return response
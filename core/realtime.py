@@ -0,0 +1,122 @@
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'realtime:'
+
+
+def user_channel(user_id):
+    return f'{CHANNEL_PREFIX}user:{user_id}'
+
+
+class LocalBroker:
+    """
+    In-process pub/sub: each subscriber is a bounded asyncio.Queue on the
+    event loop that created it. ``publish`` is safe to call from any thread,
+    so sync views and the outbox dispatcher can feed async SSE streams.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        self._deliver(channel, json.dumps(message))
+
+    def _deliver(self, channel, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._put, queue, data)
+
+    @staticmethod
+    def _put(queue, data):
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            # A stalled client loses messages rather than growing memory
+            pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+        await self._on_subscribe()
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                channel_subscribers = self._subscribers.get(channel)
+                channel_subscribers.discard(subscriber)
+                if not channel_subscribers:
+                    del self._subscribers[channel]
+
+    async def _on_subscribe(self):
+        pass
+
+
+class RedisBroker(LocalBroker):
+    """
+    Publishes through Redis so every process sees every message. Each
+    process holds a single pattern subscription and fans messages out to its
+    local subscribers, however many connections it is serving.
+    """
+
+    def __init__(self, url, queue_size=100):
+        super().__init__(queue_size)
+        self.url = url
+        self._client = None
+        self._listener = None
+
+    def publish(self, channel, message):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(channel, json.dumps(message))
+
+    async def _on_subscribe(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        import redis.asyncio as redis
+        while True:
+            try:
+                client = redis.Redis.from_url(self.url)
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(f'{CHANNEL_PREFIX}*')
+                    async for message in pubsub.listen():
+                        if message['type'] == 'pmessage':
+                            self._deliver(message['channel'].decode(), message['data'].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Realtime Redis subscription lost; reconnecting')
+                await asyncio.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            config = settings.REALTIME
+            if config['broker_url']:
+                _broker = RedisBroker(config['broker_url'], config['queue_size'])
+            else:
+                _broker = LocalBroker(config['queue_size'])
+        return _broker
+
+
+def publish_to_user(user_id, event, data):
+    get_broker().publish(user_channel(user_id), {'event': event, 'data': data})
@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from properties.models import Property
+from .notification_summary import invalidate_notification_summary
+from .stats import ACTIVE_LANDLORDS, ACTIVE_PROPERTIES, VERIFIED_PROPERTIES, adjust_site_stats
+
+
+def _has_other_active_properties(instance):
+    return Property.objects.filter(
+        landlord_id=instance.landlord_id, is_active=True
+    ).exclude(pk=instance.pk).exists()
+
+
+@receiver(post_save, sender=Property)
+def update_stats_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields and not {'is_active', 'is_verified'} & set(update_fields):
+        return
+    
+    was_active = False if created else bool(instance.get_loaded_value('is_active'))
+    was_verified = was_active and bool(instance.get_loaded_value('is_verified'))
+    is_verified = instance.is_active and instance.is_verified
+    if was_active == instance.is_active and was_verified == is_verified:
+        return
+    
+    landlord_delta = 0
+    if was_active != instance.is_active and not _has_other_active_properties(instance):
+        # First active listing for this landlord, or their last one went away
+        landlord_delta = 1 if instance.is_active else -1
+    
+    adjust_site_stats(**{
+        ACTIVE_PROPERTIES: int(instance.is_active) - int(was_active),
+        VERIFIED_PROPERTIES: int(is_verified) - int(was_verified),
+        ACTIVE_LANDLORDS: landlord_delta,
+    })
+
+
+@receiver(post_delete, sender=Property)
+def update_stats_on_delete(sender, instance, **kwargs):
+    if not instance.is_active:
+        return
+    adjust_site_stats(**{
+        ACTIVE_PROPERTIES: -1,
+        VERIFIED_PROPERTIES: -1 if instance.is_verified else 0,
+        ACTIVE_LANDLORDS: 0 if _has_other_active_properties(instance) else -1,
+    })
+
+
+@receiver(post_save, sender='notifications.Notification')
+@receiver(post_delete, sender='notifications.Notification')
+def invalidate_notification_summary_on_change(sender, instance, **kwargs):
+    invalidate_notification_summary(instance.user_id)
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .metrics import timed_cache_get
+
+CACHE_KEY = 'core:site_stats'
+CACHE_TIMEOUT = 300
+
+ACTIVE_PROPERTIES = 'active_properties'
+VERIFIED_PROPERTIES = 'verified_properties'
+ACTIVE_LANDLORDS = 'active_landlords'
+STAT_KEYS = (ACTIVE_PROPERTIES, VERIFIED_PROPERTIES, ACTIVE_LANDLORDS)
+
+
+def get_site_stats():
+    stats = timed_cache_get(cache, CACHE_KEY, 'site_stats')
+    if stats is None:
+        from .models import SiteStatistic
+        stats = dict(SiteStatistic.objects.filter(key__in=STAT_KEYS).values_list('key', 'value'))
+        if len(stats) < len(STAT_KEYS):
+            stats = recompute_site_stats()
+        cache.set(CACHE_KEY, stats, CACHE_TIMEOUT)
+    return stats
+
+
+def adjust_site_stats(**deltas):
+    from .models import SiteStatistic
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    for key, delta in deltas.items():
+        SiteStatistic.objects.filter(key=key).update(value=F('value') + delta)
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+def recompute_site_stats():
+    from properties.models import Property
+    from .models import SiteStatistic
+
+    active = Property.objects.filter(is_active=True)
+    stats = {
+        ACTIVE_PROPERTIES: active.count(),
+        VERIFIED_PROPERTIES: active.filter(is_verified=True).count(),
+        ACTIVE_LANDLORDS: active.values('landlord').distinct().count(),
+    }
+    for key, value in stats.items():
+        SiteStatistic.objects.update_or_create(key=key, defaults={'value': value})
+    cache.delete(CACHE_KEY)
+    return stats
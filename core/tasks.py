@@ -0,0 +1,19 @@
+from celery import shared_task
+from .stats import recompute_site_stats
+
+
+@shared_task
+def recompute_site_stats_task():
+    return recompute_site_stats()
+
+
+@shared_task(ignore_result=True)
+def dispatch_outbox_task():
+    from .outbox import dispatch_pending
+    return dispatch_pending(max_batches=50)
+
+
+@shared_task
+def purge_outbox_task():
+    from .outbox import purge_sent_events
+    return purge_sent_events()
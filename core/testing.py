@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, NoReverseMatch, get_resolver, reverse
+from .instrumentation import fingerprint
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(limit, label=''):
+    """Like assertNumQueries, but fails only when more than ``limit`` queries run."""
+    with CaptureQueriesContext(connection) as captured:
+        yield captured
+    if len(captured) > limit:
+        shapes = sorted({fingerprint(query['sql']) for query in captured.captured_queries})
+        raise QueryBudgetExceeded(
+            f'{label or "Block"} ran {len(captured)} queries (budget {limit}):\n' + '\n'.join(shapes)
+        )
+
+
+def named_urls(resolver=None, namespace=None, exclude_namespaces=('admin',)):
+    """Yield the fully qualified name of every named route, e.g. ``property_list``."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace in exclude_namespaces:
+                continue
+            child_namespace = pattern.namespace
+            if namespace and child_namespace:
+                child_namespace = f'{namespace}:{child_namespace}'
+            yield from named_urls(pattern, child_namespace or namespace, exclude_namespaces)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}:{pattern.name}' if namespace else pattern.name
+
+
+def check_query_budgets(client, budgets, default_budget=None, url_kwargs=None, exclude=()):
+    """
+    GET every named URL in the project and compare its query count with
+    ``budgets[name]`` (or ``default_budget``). Routes that need arguments are
+    reversed with ``url_kwargs[name]``. Routes in ``exclude`` are not requested.
+
+    Returns ``(results, missing)``; results are ``(name, queries, budget)``,
+    missing names the routes that have no budget or no ``url_kwargs`` entry,
+    so a new route cannot go unchecked.
+    """
+    url_kwargs = url_kwargs or {}
+    results, missing = [], []
+    for name in named_urls():
+        if name in exclude:
+            continue
+        budget = budgets.get(name, default_budget)
+        if budget is None:
+            missing.append(name)
+            continue
+        try:
+            url = reverse(name, kwargs=url_kwargs.get(name))
+        except NoReverseMatch:
+            missing.append(name)
+            continue
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        results.append((name, len(captured), budget))
+    return results, missing
+
+
+def assert_query_budgets(client, budgets, default_budget=None, url_kwargs=None, exclude=()):
+    """Fail with a per-URL table when any route goes over its query budget or was not checked."""
+    results, missing = check_query_budgets(client, budgets, default_budget, url_kwargs, exclude)
+    over = [(name, queries, budget) for name, queries, budget in results if queries > budget]
+    problems = [f'  {name}: {queries} queries (budget {budget})' for name, queries, budget in over]
+    problems += [f'  {name}: no budget or url_kwargs' for name in missing]
+    if problems:
+        raise QueryBudgetExceeded('Query budgets not met:\n' + '\n'.join(problems))
+    return results
@@ -1,3 +1,242 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from django.views.generic import View
+from accounts.models import User
+from bookings.models import Booking, Inquiry
+from properties.models import Property
+from .models import OutboxEvent
+from .outbox import CHANNELS, _claim, dispatch_batch
+from .page_cache import LISTINGS_TAG, AnonymousPageCacheMixin, invalidate_tags, property_tag
+from .testing import assert_query_budgets
 
-# Create your tests here.
+# Most queries any GET of each named route may run, for the landlord who owns the
+# listing and for the student who booked it. Every route needs an entry.
+QUERY_BUDGETS = {
+    'home': 8,
+    'about': 4,
+    'contact': 4,
+    'terms': 4,
+    'privacy': 4,
+    'notification_stream': 2,
+    'instrumentation_stats': 4,
+    'metrics': 2,
+    'register': 4,
+    'login': 4,
+    'dashboard': 12,
+    'profile': 6,
+    'update_profile': 6,
+    'change_password': 4,
+    'public_profile': 8,
+    'property_list': 10,
+    'property_detail': 14,
+    'property_create': 4,
+    'property_import': 4,
+    'property_update': 8,
+    'property_delete': 6,
+    'toggle_favorite': 5,
+    'my_properties': 8,
+    'my_favorites': 8,
+    'property_feed': 4,
+    'search_cache_stats': 4,
+    'create_booking': 8,
+    'booking_list': 10,
+    'booking_detail': 10,
+    'update_booking_status': 5,
+    'create_inquiry': 6,
+    'inquiry_list': 8,
+    'update_inquiry_status': 6,
+    'notification_list': 6,
+    'review_list': 8,
+}
+
+# Logging out would end the session the remaining routes are measured with
+EXCLUDED_ROUTES = ('logout',)
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.landlord = User.objects.create_user(username='landlord', password='password', user_type='landlord')
+        cls.student = User.objects.create_user(username='student', password='password', user_type='student')
+        check_in = datetime.date.today() + datetime.timedelta(days=30)
+        cls.property = Property.objects.create(
+            landlord=cls.landlord, title='Budget test flat', description='Two rooms near campus',
+            property_type='apartment', room_type='single', address='1 College Road', city='Boston',
+            state='MA', zip_code='02115', price_per_month=900, bedrooms=2, bathrooms=1,
+            nearest_university='Northeastern University', distance_to_university=1,
+            available_from=check_in, maximum_occupants=2, is_active=True, is_verified=True,
+        )
+        cls.booking = Booking.objects.create(
+            student=cls.student, landlord=cls.landlord, property=cls.property,
+            check_in_date=check_in, check_out_date=check_in + datetime.timedelta(days=120), total_price=3600,
+        )
+        cls.inquiry = Inquiry.objects.create(property=cls.property, student=cls.student, message='Is it quiet?')
+
+    def url_kwargs(self):
+        return {
+            'public_profile': {'username': self.landlord.username},
+            'property_detail': {'pk': self.property.pk},
+            'property_update': {'pk': self.property.pk},
+            'property_delete': {'pk': self.property.pk},
+            'toggle_favorite': {'pk': self.property.pk},
+            'create_booking': {'property_id': self.property.pk},
+            'booking_detail': {'pk': self.booking.pk},
+            'update_booking_status': {'pk': self.booking.pk, 'status': 'approved'},
+            'create_inquiry': {'property_id': self.property.pk},
+            'update_inquiry_status': {'pk': self.inquiry.pk, 'status': 'contacted'},
+        }
+
+    def assert_budgets_as(self, user):
+        self.client.force_login(user)
+        assert_query_budgets(self.client, QUERY_BUDGETS, url_kwargs=self.url_kwargs(), exclude=EXCLUDED_ROUTES)
+
+    def test_landlord_routes_within_budget(self):
+        self.assert_budgets_as(self.landlord)
+
+    def test_student_routes_within_budget(self):
+        self.assert_budgets_as(self.student)
+
+
+class CountingView(AnonymousPageCacheMixin, View):
+    renders = 0
+
+    def get_page_cache_tags(self):
+        return [LISTINGS_TAG, property_tag(1)]
+
+    def get(self, request):
+        CountingView.renders += 1
+        return HttpResponse(f'render {CountingView.renders}')
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        CountingView.renders = 0
+        self.view = CountingView.as_view()
+
+    def get(self, **headers):
+        request = RequestFactory().get('/listing/', **headers)
+        request.user = AnonymousUser()
+        request.session = {}
+        return self.view(request)
+
+    def invalidate(self, *tags):
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_tags(*tags)
+
+    def test_repeat_requests_are_served_from_the_cache(self):
+        first = self.get()
+        second = self.get()
+        self.assertEqual(CountingView.renders, 1)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(CountingView.renders, 1)
+
+    def test_invalidated_tag_changes_the_etag_and_renders_again(self):
+        etag = self.get()['ETag']
+        self.invalidate(property_tag(1))
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'render 2')
+
+    def test_unrelated_tags_leave_the_page_cached(self):
+        etag = self.get()['ETag']
+        self.invalidate(property_tag(2))
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(CountingView.renders, 1)
+
+    def test_signed_in_users_bypass_the_cache(self):
+        self.get()
+        request = RequestFactory().get('/listing/')
+        request.user = User(username='student')
+        request.session = {}
+        response = self.view(request)
+        self.assertEqual(response.content, b'render 2')
+        self.assertFalse(response.has_header('ETag'))
+
+
+class OutboxDispatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', password='password', email='student@example.com')
+
+    def setUp(self):
+        self.failures = {}
+        self.delivered = []
+        channels = mock.patch.dict(CHANNELS, {'test': self.deliver})
+        channels.start()
+        self.addCleanup(channels.stop)
+        self.event = OutboxEvent.objects.create(
+            channel='test', event_type='booking_approved', recipient=self.user,
+            payload={'title': 'Approved'}, dedupe_key='booking:1:test',
+        )
+
+    def deliver(self, events):
+        self.delivered += [event.pk for event in events]
+        return {event.pk: self.failures[event.pk] for event in events if event.pk in self.failures}
+
+    def make_due(self):
+        OutboxEvent.objects.filter(pk=self.event.pk).update(next_attempt_at=timezone.now())
+
+    def test_delivered_events_are_marked_sent(self):
+        self.assertEqual(dispatch_batch(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, 'sent')
+        self.assertEqual(self.event.attempts, 1)
+        self.assertEqual(dispatch_batch(), 0)
+
+    def test_failed_delivery_is_retried_after_a_backoff(self):
+        self.failures[self.event.pk] = 'SMTP timeout'
+        before = timezone.now()
+        dispatch_batch()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, 'pending')
+        self.assertEqual(self.event.last_error, 'SMTP timeout')
+        self.assertGreaterEqual(self.event.next_attempt_at, before + datetime.timedelta(seconds=30))
+
+        # Not due yet
+        self.assertEqual(dispatch_batch(), 0)
+
+        del self.failures[self.event.pk]
+        self.make_due()
+        dispatch_batch()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, 'sent')
+        self.assertEqual(self.event.attempts, 2)
+        self.assertEqual(self.event.last_error, '')
+
+    def test_gives_up_after_max_attempts(self):
+        self.failures[self.event.pk] = 'Mailbox unavailable'
+        with self.settings(OUTBOX={'batch_size': 10, 'max_attempts': 2, 'retry_backoff': 30, 'claim_timeout': 300}):
+            dispatch_batch()
+            self.make_due()
+            dispatch_batch()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, 'failed')
+        self.assertEqual(self.event.attempts, 2)
+
+    def test_claimed_events_wait_for_the_lease_to_expire(self):
+        # A dispatcher claims the event and dies before recording the result
+        claimed = _claim(10, timezone.now())
+        self.assertEqual([event.pk for event in claimed], [self.event.pk])
+        self.assertEqual(dispatch_batch(), 0)
+        self.assertEqual(self.delivered, [])
+
+        self.make_due()
+        self.assertEqual(dispatch_batch(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, 'sent')
+        self.assertEqual(self.delivered, [self.event.pk])
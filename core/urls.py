@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import HomeView, AboutView, ContactView, TermsView, PrivacyView
+from .views import HomeView, AboutView, ContactView, TermsView, PrivacyView, notification_stream, instrumentation_stats, metrics
 
 urlpatterns = [
     path('', HomeView.as_view(), name='home'),
@@ -7,4 +7,7 @@ urlpatterns = [
     path('contact/', ContactView.as_view(), name='contact'),
     path('terms/', TermsView.as_view(), name='terms'),
     path('privacy/', PrivacyView.as_view(), name='privacy'),
+    path('notifications/stream/', notification_stream, name='notification_stream'),
+    path('instrumentation/stats/', instrumentation_stats, name='instrumentation_stats'),
+    path('metrics/', metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -1,10 +1,25 @@
+import asyncio
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
 from django.views.generic import TemplateView
 from properties.models import Property
+from accounts.decorators import admin_required
+from .instrumentation import view_statistics
+from .metrics import render_metrics
+from .notification_summary import get_notification_summary
+from .page_cache import AnonymousPageCacheMixin
+from .realtime import get_broker, user_channel
+from .stats import ACTIVE_LANDLORDS, ACTIVE_PROPERTIES, VERIFIED_PROPERTIES, get_site_stats
 from django.db.models import Count, Avg, Q
 import random
 
-class HomeView(TemplateView):
+class HomeView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'core/home.jinja'
     
     def get_context_data(self, **kwargs):
@@ -14,18 +29,16 @@ class HomeView(TemplateView):
         featured_properties = Property.objects.filter(
             is_active=True,
             is_verified=True
-        ).select_related('landlord')[:8]
+        ).select_related('landlord').with_primary_image()[:8]
         
-        # Get statistics
-        total_properties = Property.objects.filter(is_active=True).count()
-        verified_properties = Property.objects.filter(is_active=True, is_verified=True).count()
-        active_landlords = Property.objects.filter(is_active=True).values('landlord').distinct().count()
+        # Get statistics (materialized, see core.stats)
+        stats = get_site_stats()
         
         context.update({
             'featured_properties': featured_properties,
-            'total_properties': total_properties,
-            'verified_properties': verified_properties,
-            'active_landlords': active_landlords,
+            'total_properties': stats[ACTIVE_PROPERTIES],
+            'verified_properties': stats[VERIFIED_PROPERTIES],
+            'active_landlords': stats[ACTIVE_LANDLORDS],
         })
         return context
 
@@ -41,6 +54,70 @@ class TermsView(TemplateView):
 class PrivacyView(TemplateView):
     template_name = 'core/privacy.jinja'
 
+def _sse(event, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {event}', f'data: {json.dumps(data)}']
+    return '\n'.join(lines) + '\n\n'
+
+async def _notification_events(user_id, unread):
+    config = settings.REALTIME
+    # Streams end after max_stream_seconds and the browser reconnects, so a
+    # disconnect the server never noticed cannot hold a subscription forever
+    deadline = time.monotonic() + config['max_stream_seconds']
+    
+    yield f"retry: {config['retry_ms']}\n" + _sse('summary', {'unread': unread})
+    async with get_broker().subscribe(user_channel(user_id)) as queue:
+        while time.monotonic() < deadline:
+            try:
+                message = json.loads(await asyncio.wait_for(queue.get(), config['heartbeat_seconds']))
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield _sse(message['event'], message['data'], message['data'].get('id'))
+
+async def notification_stream(request):
+    """
+    Server-sent events for the signed-in user: new notifications, booking
+    status changes and inquiry replies. Only served by the ASGI application,
+    where an idle stream is just a coroutine waiting on a queue.
+    """
+    if not settings.REALTIME['enabled'] or not isinstance(request, ASGIRequest):
+        # 204 tells EventSource not to reconnect; under WSGI a stream would hold a worker
+        return HttpResponse(status=204)
+    
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        return HttpResponse(status=401)
+    
+    summary = await sync_to_async(get_notification_summary)(user)
+    response = StreamingHttpResponse(_notification_events(user.pk, summary['unread']), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    origin = request.headers.get('Origin')
+    if origin in settings.REALTIME['allowed_origins']:
+        # The stream process has its own origin; the session cookie still applies
+        response['Access-Control-Allow-Origin'] = origin
+        response['Access-Control-Allow-Credentials'] = 'true'
+        response['Vary'] = 'Origin'
+    return response
+
+@admin_required
+def instrumentation_stats(request):
+    return JsonResponse(view_statistics.snapshot())
+
+def _has_metrics_access(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    return bool(settings.METRICS_TOKEN) and constant_time_compare(token, settings.METRICS_TOKEN)
+
+def metrics(request):
+    """Prometheus text exposition; staff sessions or the METRICS_TOKEN bearer token."""
+    if not _has_metrics_access(request):
+        return HttpResponse(status=403)
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
 def handler404(request, exception):
     return render(request, 'core/404.jinja', status=404)
 
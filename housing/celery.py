@@ -0,0 +1,18 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'housing.settings')
+
+app = Celery('housing')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+
+def enqueue(task, *args, **kwargs):
+    """Queue ``task`` on the worker, running it in-process if the broker is unreachable."""
+    from kombu.exceptions import OperationalError
+    try:
+        return task.delay(*args, **kwargs)
+    except OperationalError:
+        return task.apply(args=args, kwargs=kwargs)
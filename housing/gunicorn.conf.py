@@ -0,0 +1,24 @@
+import os
+import shutil
+
+# Workers share Prometheus samples through files in PROMETHEUS_MULTIPROC_DIR
+
+
+def on_starting(server):
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        # Samples left over from a previous run would be summed into the new one
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def post_worker_init(worker):
+    # Load the match scoring snapshot in the background before the first dashboard asks for it
+    from properties.matching import listing_snapshot
+    listing_snapshot.start()
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,7 +1,12 @@
 from django_jinja import library
 from django.contrib.humanize.templatetags import humanize
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Model
 from django.template.defaultfilters import date as date_filter
 from django.utils import timezone
+from jinja2 import nodes
+from jinja2.ext import Extension
 
 @library.filter
 def naturaltime(value):
@@ -82,4 +87,46 @@ def is_student(user):
 
 @library.global_function
 def is_admin(user):
-    return user.is_authenticated and user.is_staff
\ No newline at end of file
+    return user.is_authenticated and user.is_staff
+
+def fragment_vary_key(value):
+    """Model instances vary on their pk and, when they have one, updated_at."""
+    if isinstance(value, Model):
+        updated_at = getattr(value, 'updated_at', None)
+        return f'{value._meta.label}:{value.pk}:{updated_at.isoformat() if updated_at else ""}'
+    return str(value)
+
+class FragmentCacheExtension(Extension):
+    """
+    Jinja counterpart of Django's ``{% cache %}`` tag, with the same syntax::
+
+        {% cache 600 property_card property user.user_type %}...{% endcache %}
+
+    The fragment name is a bare word; everything after it is varied on.
+    Like Django, uses the ``template_fragments`` cache if configured, else ``default``.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        timeout = parser.parse_expression()
+        name = nodes.Const(parser.stream.expect('name').value)
+        vary_on = []
+        while parser.stream.current.type != 'block_end':
+            parser.stream.skip_if('comma')
+            vary_on.append(parser.parse_expression())
+
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_cache_support', [timeout, name, nodes.List(vary_on)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _cache_support(self, timeout, name, vary_on, caller):
+        cache = caches['template_fragments'] if 'template_fragments' in caches else caches['default']
+        key = make_template_fragment_key(name, [fragment_vary_key(value) for value in vary_on])
+        value = cache.get(key)
+        if value is None:
+            value = caller()
+            cache.set(key, value, timeout)
+        return value
@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',
+    'django.contrib.postgres',
     
     # Third party apps
     'django_jinja',
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,7 +82,14 @@ TEMPLATES = [
                 'django_jinja.builtins.extensions.CsrfExtension',
                 'django_jinja.builtins.extensions.StaticFilesExtension',
                 'django_jinja.builtins.extensions.DjangoFiltersExtension',
+                'housing.jinja2.FragmentCacheExtension',
             ],
+            # Compiled templates persist in the jinja_bytecode cache across worker restarts
+            'bytecode_cache': {
+                'name': 'jinja_bytecode',
+                'backend': 'django_jinja.cache.BytecodeCache',
+                'enabled': env.bool('JINJA_BYTECODE_CACHE', default=True),
+            },
         },
     },
     {
@@ -163,10 +172,119 @@ EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='noreply@studenthousing.com')
 
+# Cache: set CACHE_URL (e.g. redis://redis:6379/1) to share it between worker processes;
+# notification summaries are only cached in a shared cache
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    'jinja_bytecode': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env('JINJA_BYTECODE_DIR', default=str(BASE_DIR / '.cache' / 'jinja')),
+        'TIMEOUT': None,
+    },
+}
+
 # Redis & Celery Configuration
 REDIS_URL = env('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
+# Run tasks in-process when no worker is available (local development)
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', default=DEBUG)
+CELERY_BEAT_SCHEDULE = {
+    'recompute-site-stats': {
+        'task': 'core.tasks.recompute_site_stats_task',
+        'schedule': timedelta(hours=1),
+    },
+    'reconcile-favorite-counts': {
+        'task': 'properties.tasks.reconcile_favorite_counts_task',
+        'schedule': timedelta(hours=24),
+    },
+    'dispatch-outbox': {
+        'task': 'core.tasks.dispatch_outbox_task',
+        'schedule': timedelta(seconds=30),
+    },
+    'purge-outbox': {
+        'task': 'core.tasks.purge_outbox_task',
+        'schedule': timedelta(hours=24),
+    },
+    'purge-expired-capacity-holds': {
+        'task': 'bookings.tasks.purge_expired_holds_task',
+        'schedule': timedelta(hours=1),
+    },
+    'refresh-similar-neighbors': {
+        'task': 'properties.tasks.refresh_pending_neighbors_task',
+        'schedule': timedelta(minutes=1),
+    },
+    'flush-view-counts': {
+        'task': 'properties.tasks.flush_view_counts_task',
+        'schedule': timedelta(seconds=env.int('VIEW_COUNT_FLUSH_INTERVAL', default=30)),
+    },
+}
+
+# Property search result cache: ID lists per worker process, invalidated through tag
+# versions in the default cache (shared between processes when CACHE_URL is set)
+PROPERTY_SEARCH_CACHE = {
+    'max_entries': env.int('PROPERTY_SEARCH_CACHE_ENTRIES', default=500),
+    'timeout': env.int('PROPERTY_SEARCH_CACHE_TIMEOUT', default=60),
+    'max_ids': 2000,
+}
+
+# Buffered property view counts; set VIEW_COUNT_BUFFER_URL (e.g. redis://redis:6379/3) to buffer
+# them in Redis, where the flush-view-counts beat task drains hits from every worker
+VIEW_COUNT_FLUSH_INTERVAL = env.int('VIEW_COUNT_FLUSH_INTERVAL', default=30)
+VIEW_COUNT_MAX_PENDING = 1000
+VIEW_COUNT_BUFFER_URL = env('VIEW_COUNT_BUFFER_URL', default='')
+
+# Student match scoring snapshot (seconds); each refresh re-reads rows updated within
+# MATCH_SNAPSHOT_OVERLAP before the previous one, to catch late-committing transactions
+MATCH_SNAPSHOT_REFRESH_INTERVAL = 60
+MATCH_SNAPSHOT_REBUILD_INTERVAL = 3600
+MATCH_SNAPSHOT_OVERLAP = 300
+
+# Tokens granting partners access to the listings feed
+PROPERTY_FEED_TOKENS = env.list('PROPERTY_FEED_TOKENS', default=[])
+
+# How long a pending booking request keeps its capacity reserved (minutes)
+BOOKING_HOLD_MINUTES = env.int('BOOKING_HOLD_MINUTES', default=30)
+
+# Notification outbox: events per batch, delivery attempts, first retry delay (seconds, doubling),
+# and how long claimed events stay in flight before another dispatcher may retry them (seconds)
+OUTBOX = {
+    'batch_size': env.int('OUTBOX_BATCH_SIZE', default=100),
+    'max_attempts': 8,
+    'retry_backoff': 30,
+    'claim_timeout': 300,
+}
+
+# Server-sent notification streams. The site itself runs under WSGI; streams are served by
+# housing.asgi in a separate process (the compose ``stream`` service), since a sync worker
+# would be tied up by each open stream. Point REALTIME_STREAM_URL at that process, or leave
+# it empty when a proxy routes /notifications/stream/ there; a stream from another origin
+# must list the site in REALTIME_ALLOWED_ORIGINS. Events are published through Redis by
+# default, since the outbox dispatcher and the streams live in different processes.
+REALTIME = {
+    'enabled': env.bool('REALTIME_ENABLED', default=False),
+    'stream_url': env('REALTIME_STREAM_URL', default=''),
+    'allowed_origins': env.list('REALTIME_ALLOWED_ORIGINS', default=[]),
+    'broker_url': env('REALTIME_BROKER_URL', default=REDIS_URL),
+    'queue_size': 100,
+    'heartbeat_seconds': 15,
+    'max_stream_seconds': 300,
+    'retry_ms': 3000,
+}
+
+# Whole-page cache for anonymous visitors (seconds); also how long a process-local cache can
+# keep serving pages another process has invalidated, so set CACHE_URL when running several
+PAGE_CACHE_TIMEOUT = env.int('PAGE_CACHE_TIMEOUT', default=300)
+
+# Per-request SQL/template instrumentation: X-* debug headers, or per-view histograms
+INSTRUMENTATION = {
+    'headers': env.bool('INSTRUMENTATION_HEADERS', default=DEBUG),
+    # Identical query shapes per request before a possible N+1 is logged
+    'n_plus_one_threshold': 5,
+}
+
+# Bearer token for Prometheus scrapes of /metrics/ (staff sessions also work)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
 
 # Site Settings
 SITE_NAME = 'Student Housing Platform'
@@ -0,0 +1,199 @@
+import atexit
+import datetime
+import logging
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Write-behind buffer for property page views.
+
+    Hits are aggregated in memory per (property, day) and written at most
+    once per ``flush_interval`` seconds (or when ``max_pending`` distinct
+    keys accumulate) as a handful of ``F()`` updates, instead of a
+    row-locking UPDATE per page view. Whatever is still buffered when the
+    process exits is flushed by an atexit hook.
+
+    The buffer is private to the process, so a worker that goes idle keeps
+    its hits until its next request; with several workers use
+    ``RedisViewCounter``.
+    """
+
+    def __init__(self, flush_interval=30, max_pending=1000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, property_id):
+        key = (property_id, timezone.localdate())
+        with self._lock:
+            self._pending[key] += 1
+            due = (len(self._pending) >= self.max_pending or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        try:
+            self._write(pending)
+        except DatabaseError:
+            logger.exception('Failed to flush %d buffered property view counts', len(pending))
+            # Keep the deltas for the next attempt
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return sum(pending.values())
+
+    def _write(self, pending):
+        from .models import Property, PropertyViewDaily
+
+        totals = Counter()
+        for (property_id, day), views in pending.items():
+            totals[property_id] += views
+
+        # Properties deleted since the hit was recorded are dropped
+        existing = set(Property.objects.filter(pk__in=totals).values_list('pk', flat=True))
+
+        # Properties sharing the same delta are bumped by a single UPDATE
+        by_delta = defaultdict(list)
+        for property_id, views in totals.items():
+            if property_id in existing:
+                by_delta[views].append(property_id)
+
+        daily_by_delta = defaultdict(list)
+        for (property_id, day), views in pending.items():
+            if property_id in existing:
+                daily_by_delta[(day, views)].append(property_id)
+
+        with transaction.atomic():
+            for views, property_ids in by_delta.items():
+                Property.objects.filter(pk__in=property_ids).update(view_count=F('view_count') + views)
+
+            PropertyViewDaily.objects.bulk_create(
+                [PropertyViewDaily(property_id=property_id, date=day, views=0)
+                 for (property_id, day) in pending if property_id in existing],
+                ignore_conflicts=True
+            )
+            for (day, views), property_ids in daily_by_delta.items():
+                PropertyViewDaily.objects.filter(
+                    property_id__in=property_ids, date=day
+                ).update(views=F('views') + views)
+
+
+class RedisViewCounter(ViewCounter):
+    """
+    Buffers hits in one Redis hash shared by every process. Recording is a
+    single HINCRBY; the periodic flush task (in any process) drains the hash
+    for all of them, so no worker sits on unflushed hits. Hits recorded
+    while Redis is unreachable fall back to the in-process buffer.
+    """
+
+    KEY = 'property_views:pending'
+    # Seconds after which another flush takes over a processing hash
+    ABANDONED_AFTER = 600
+
+    def __init__(self, url, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def record(self, property_id):
+        import redis
+        try:
+            self.client.hincrby(self.KEY, f'{property_id}|{timezone.localdate().isoformat()}', 1)
+        except redis.RedisError:
+            logger.warning('Redis unavailable; buffering property views in process')
+            super().record(property_id)
+
+    def flush(self):
+        import redis
+        flushed = super().flush()
+        try:
+            return flushed + self._flush_shared()
+        except redis.RedisError:
+            # The hits stay in Redis (or in a processing hash adopted later) for the next flush
+            logger.warning('Redis unavailable; buffered property views wait for the next flush')
+            return flushed
+
+    def _flush_shared(self):
+        import redis
+        written = 0
+        # Processing hashes left behind by a flush that lost Redis halfway
+        for key in self.client.scan_iter(f'{self.KEY}:*'):
+            started = int(key.decode().split(':')[-2])
+            if time.time() - started > self.ABANDONED_AFTER:
+                try:
+                    written += self._drain(key)
+                except redis.ResponseError:
+                    pass
+
+        try:
+            # Take the pending hash atomically; hits arriving meanwhile start a new one
+            return written + self._drain(self.KEY)
+        except redis.ResponseError:
+            return written
+
+    def _drain(self, key):
+        processing = f'{self.KEY}:{int(time.time())}:{uuid.uuid4().hex}'
+        # Raises ResponseError when there is nothing to take, or another flush took it first
+        self.client.rename(key, processing)
+        raw = self.client.hgetall(processing)
+
+        pending = Counter()
+        for field, views in raw.items():
+            property_id, day = field.decode().rsplit('|', 1)
+            pending[(uuid.UUID(property_id), datetime.date.fromisoformat(day))] += int(views)
+
+        try:
+            self._write(pending)
+        except DatabaseError:
+            logger.exception('Failed to flush %d buffered property view counts', len(pending))
+            # Hand the deltas back for the next flush
+            pipeline = self.client.pipeline()
+            for field, views in raw.items():
+                pipeline.hincrby(self.KEY, field, int(views))
+            pipeline.delete(processing)
+            pipeline.execute()
+            return 0
+
+        self.client.delete(processing)
+        return sum(pending.values())
+
+
+def _make_view_counter():
+    options = {
+        'flush_interval': getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 30),
+        'max_pending': getattr(settings, 'VIEW_COUNT_MAX_PENDING', 1000),
+    }
+    url = getattr(settings, 'VIEW_COUNT_BUFFER_URL', '')
+    if url:
+        return RedisViewCounter(url, **options)
+    return ViewCounter(**options)
+
+
+view_counter = _make_view_counter()
+atexit.register(view_counter.flush)
@@ -0,0 +1,122 @@
+import csv
+import datetime
+import decimal
+import heapq
+import json
+import zlib
+from django.core.files.storage import default_storage
+from django.db.models import BooleanField, ExpressionWrapper, OuterRef, Q, Subquery
+from .models import DeletedProperty, Property, PropertyImage
+
+FORMATS = ('jsonl', 'csv')
+ITERATOR_CHUNK_SIZE = 2000
+# Output is handed to the response in pieces of roughly this many bytes
+WRITE_BUFFER_SIZE = 64 * 1024
+
+EXPORT_FIELDS = [
+    'id', 'title', 'description', 'property_type', 'room_type',
+    'address', 'city', 'state', 'zip_code', 'country', 'latitude', 'longitude',
+    'price_per_month', 'security_deposit', 'utilities_included', 'wifi_included',
+    'bedrooms', 'bathrooms', 'area_sqft', 'furnished', 'has_kitchen', 'has_laundry',
+    'has_parking', 'has_gym', 'has_pool', 'pet_friendly', 'smoking_allowed',
+    'nearest_university', 'distance_to_university', 'transport_options',
+    'available_from', 'available_to', 'minimum_stay_months', 'maximum_occupants',
+    'created_at', 'updated_at',
+]
+# ``active`` is false for tombstones: listings deactivated, deleted or unverified since the last pull.
+# Hard-deleted listings come from DeletedProperty with only id and updated_at set.
+COLUMNS = EXPORT_FIELDS + ['primary_image', 'active']
+LISTED = Q(is_active=True, is_verified=True)
+
+
+def export_queryset(updated_since=None):
+    """
+    Listed properties, or with ``updated_since`` every property changed
+    after it, so incremental consumers also see the ones to remove.
+    """
+    primary_image = PropertyImage.objects.filter(
+        property=OuterRef('pk')
+    ).order_by('-is_primary', 'uploaded_at').values('image')[:1]
+
+    if updated_since:
+        queryset = Property.objects.filter(updated_at__gt=updated_since)
+    else:
+        queryset = Property.objects.filter(LISTED)
+    return queryset.annotate(
+        primary_image=Subquery(primary_image),
+        active=ExpressionWrapper(LISTED, output_field=BooleanField()),
+    ).order_by('updated_at', 'pk').values(*COLUMNS)
+
+
+def deleted_rows(updated_since):
+    """Tombstone rows for listings hard-deleted after ``updated_since``, oldest first."""
+    deleted = DeletedProperty.objects.filter(deleted_at__gt=updated_since).order_by('deleted_at', 'property_id')
+    for property_id, deleted_at in deleted.values_list('property_id', 'deleted_at').iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        row = dict.fromkeys(COLUMNS)
+        row.update(id=property_id, updated_at=deleted_at, active=False)
+        yield row
+
+
+def _to_text(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if value is None:
+        return ''
+    return str(value) if not isinstance(value, (bool, int, float)) else value
+
+
+def _serialize(row):
+    row['id'] = str(row['id'])
+    row['primary_image'] = default_storage.url(row['primary_image']) if row['primary_image'] else None
+    return row
+
+
+class _LineBuffer:
+    # csv.writer target that just hands back what it was given
+    def write(self, value):
+        return value
+
+
+def iter_lines(rows, fmt):
+    if fmt == 'csv':
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(COLUMNS)
+        for row in rows:
+            row = _serialize(row)
+            yield writer.writerow([_to_text(row[column]) for column in COLUMNS])
+    else:
+        for row in rows:
+            yield json.dumps(_serialize(row), default=_to_text) + '\n'
+
+
+def stream_export(fmt='jsonl', updated_since=None, compress=False):
+    """
+    Yield the feed as byte chunks. Rows come from a server-side cursor
+    (``iterator``) so memory stays flat whatever the table size; the query
+    is a plain SELECT and takes no row locks.
+    """
+    rows = export_queryset(updated_since).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    if updated_since:
+        rows = heapq.merge(rows, deleted_rows(updated_since), key=lambda row: row['updated_at'])
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    buffer = []
+    size = 0
+    for line in iter_lines(rows, fmt):
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= WRITE_BUFFER_SIZE:
+            chunk = b''.join(buffer)
+            buffer, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+
+    chunk = b''.join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,110 @@
+from django.db.models import Count, Q
+from .models import Property
+
+PRICE_BUCKETS = (
+    (None, 500),
+    (500, 1000),
+    (1000, 1500),
+    (1500, 2000),
+    (2000, None),
+)
+
+BEDROOM_VALUES = range(0, 6)
+
+AMENITY_FACETS = (
+    ('furnished', 'Furnished'),
+    ('pet_friendly', 'Pet Friendly'),
+    ('utilities_included', 'Utilities Included'),
+    ('has_parking', 'Parking Available'),
+    ('wifi_included', 'WiFi Included'),
+    ('has_laundry', 'Laundry'),
+    ('has_gym', 'Gym'),
+    ('has_pool', 'Pool'),
+)
+
+
+def _price_q(min_price, max_price):
+    q = Q()
+    if min_price:
+        q &= Q(price_per_month__gte=min_price)
+    if max_price:
+        q &= Q(price_per_month__lte=max_price)
+    return q
+
+
+def facet_filters(cleaned_data):
+    """Filters applied by the faceted fields of PropertySearchForm, keyed by facet group."""
+    filters = {}
+    if cleaned_data.get('property_type'):
+        filters['property_type'] = Q(property_type=cleaned_data['property_type'])
+    if cleaned_data.get('room_type'):
+        filters['room_type'] = Q(room_type=cleaned_data['room_type'])
+    if cleaned_data.get('bedrooms') is not None:
+        filters['bedrooms'] = Q(bedrooms=cleaned_data['bedrooms'])
+    if cleaned_data.get('min_price') or cleaned_data.get('max_price'):
+        filters['price'] = _price_q(cleaned_data.get('min_price'), cleaned_data.get('max_price'))
+    for field, label in AMENITY_FACETS:
+        if cleaned_data.get(field):
+            filters[field] = Q(**{field: True})
+    return filters
+
+
+def compute_facets(queryset, cleaned_data):
+    """
+    Count every facet value in a single aggregate query over ``queryset``
+    (the search results before facet filters). Each group's counts honour
+    all applied filters except the group's own, so selecting a value does
+    not zero out its siblings.
+    """
+    applied = facet_filters(cleaned_data)
+
+    def excluding(group):
+        q = Q()
+        for name, facet_q in applied.items():
+            if name != group:
+                q &= facet_q
+        return q
+
+    aggregates = {'total': Count('pk', filter=excluding(None))}
+    for value, label in Property.PROPERTY_TYPE_CHOICES:
+        aggregates[f'property_type:{value}'] = Count('pk', filter=Q(property_type=value) & excluding('property_type'))
+    for value, label in Property.ROOM_TYPE_CHOICES:
+        aggregates[f'room_type:{value}'] = Count('pk', filter=Q(room_type=value) & excluding('room_type'))
+    for value in BEDROOM_VALUES:
+        aggregates[f'bedrooms:{value}'] = Count('pk', filter=Q(bedrooms=value) & excluding('bedrooms'))
+    for i, (low, high) in enumerate(PRICE_BUCKETS):
+        # Same inclusive bounds as the min_price/max_price link the bucket produces
+        aggregates[f'price:{i}'] = Count('pk', filter=_price_q(low, high) & excluding('price'))
+    for field, label in AMENITY_FACETS:
+        aggregates[f'amenity:{field}'] = Count('pk', filter=Q(**{field: True}) & excluding(field))
+
+    counts = queryset.order_by().aggregate(**aggregates)
+
+    return {
+        'total': counts['total'],
+        'property_type': [
+            {'value': value, 'label': label, 'count': counts[f'property_type:{value}']}
+            for value, label in Property.PROPERTY_TYPE_CHOICES
+        ],
+        'room_type': [
+            {'value': value, 'label': label, 'count': counts[f'room_type:{value}']}
+            for value, label in Property.ROOM_TYPE_CHOICES
+        ],
+        'bedrooms': [
+            {'value': value, 'label': 'Studio' if value == 0 else str(value), 'count': counts[f'bedrooms:{value}']}
+            for value in BEDROOM_VALUES
+        ],
+        'price': [
+            {
+                'min': low or '',
+                'max': high or '',
+                'label': f'Under ${high:,}' if low is None else (f'${low:,}+' if high is None else f'${low:,} - ${high:,}'),
+                'count': counts[f'price:{i}'],
+            }
+            for i, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+        'amenities': [
+            {'field': field, 'label': label, 'count': counts[f'amenity:{field}']}
+            for field, label in AMENITY_FACETS
+        ],
+    }
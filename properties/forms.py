@@ -54,7 +54,22 @@ class PropertyForm(forms.ModelForm):
         
         return cleaned_data
 
+class PropertyImportForm(PropertyForm):
+    """PropertyForm validation for bulk-imported rows, which may also carry coordinates."""
+    
+    class Meta(PropertyForm.Meta):
+        fields = PropertyForm.Meta.fields + ['latitude', 'longitude']
+
 class PropertySearchForm(forms.Form):
+    ORDERING_CHOICES = (
+        ('', 'Recommended'),
+        ('-created_at', 'Newest First'),
+        ('price_per_month', 'Price: Low to High'),
+        ('-price_per_month', 'Price: High to Low'),
+        ('-view_count', 'Most Popular'),
+        ('distance', 'Nearest First'),
+    )
+    
     query = forms.CharField(required=False, widget=forms.TextInput(attrs={
         'placeholder': 'Search properties...',
         'class': 'w-full'
@@ -89,6 +104,39 @@ class PropertySearchForm(forms.Form):
     pet_friendly = forms.BooleanField(required=False, widget=forms.CheckboxInput())
     utilities_included = forms.BooleanField(required=False, widget=forms.CheckboxInput())
     has_parking = forms.BooleanField(required=False, widget=forms.CheckboxInput())
+    wifi_included = forms.BooleanField(required=False, widget=forms.CheckboxInput())
+    has_laundry = forms.BooleanField(required=False, widget=forms.CheckboxInput())
+    has_gym = forms.BooleanField(required=False, widget=forms.CheckboxInput())
+    has_pool = forms.BooleanField(required=False, widget=forms.CheckboxInput())
+    
+    # Spatial search: a radius around a point, or a map viewport ("south,west,north,east")
+    lat = forms.FloatField(required=False, min_value=-90, max_value=90, widget=forms.HiddenInput())
+    lng = forms.FloatField(required=False, min_value=-180, max_value=180, widget=forms.HiddenInput())
+    radius_km = forms.FloatField(required=False, min_value=0.1, max_value=100, widget=forms.NumberInput(attrs={
+        'placeholder': 'Within (km)',
+        'step': 0.5,
+        'class': 'w-full'
+    }))
+    bbox = forms.CharField(required=False, widget=forms.HiddenInput())
+    move_in = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date', 'class': 'w-full'}))
+    move_out = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date', 'class': 'w-full'}))
+    ordering = forms.ChoiceField(required=False, choices=ORDERING_CHOICES, widget=forms.Select(attrs={'class': 'w-full'}))
+    
+    def clean_bbox(self):
+        bbox = self.cleaned_data.get('bbox')
+        if not bbox:
+            return None
+        
+        try:
+            south, west, north, east = [float(value) for value in bbox.split(',')]
+        except ValueError:
+            raise forms.ValidationError('Map bounds must be four numbers: south,west,north,east.')
+        
+        if not (-90 <= south < north <= 90):
+            raise forms.ValidationError('Invalid latitude bounds.')
+        if not (-180 <= west < east <= 180):
+            raise forms.ValidationError('Invalid longitude bounds.')
+        return south, west, north, east
     
     def clean(self):
         cleaned_data = super().clean()
@@ -98,4 +146,30 @@ class PropertySearchForm(forms.Form):
         if min_price and max_price and min_price > max_price:
             self.add_error('max_price', 'Maximum price must be greater than minimum price.')
         
-        return cleaned_data
\ No newline at end of file
+        has_point = cleaned_data.get('lat') is not None and cleaned_data.get('lng') is not None
+        if cleaned_data.get('radius_km') and not has_point:
+            self.add_error('radius_km', 'A location is required for radius search.')
+        if cleaned_data.get('ordering') == 'distance' and not (has_point or cleaned_data.get('bbox')):
+            self.add_error('ordering', 'A location is required to sort by distance.')
+        
+        move_in = cleaned_data.get('move_in')
+        move_out = cleaned_data.get('move_out')
+        if bool(move_in) != bool(move_out):
+            self.add_error('move_out' if move_in else 'move_in', 'Both move-in and move-out dates are required.')
+        elif move_in and move_out <= move_in:
+            self.add_error('move_out', 'Move-out date must be after move-in date.')
+        
+        return cleaned_data
+    
+    def get_search_center(self):
+        """Point distances are measured from: the given location, else the viewport centre."""
+        lat = self.cleaned_data.get('lat')
+        lng = self.cleaned_data.get('lng')
+        if lat is not None and lng is not None:
+            return lat, lng
+        
+        bbox = self.cleaned_data.get('bbox')
+        if bbox:
+            south, west, north, east = bbox
+            return (south + north) / 2, (west + east) / 2
+        return None
\ No newline at end of file
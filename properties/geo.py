@@ -0,0 +1,130 @@
+import math
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Precision stored on Property.geohash (~150m cells)
+GEOHASH_PRECISION = 7
+# Upper bound on prefix cells OR-ed together for one spatial lookup
+MAX_COVER_CELLS = 16
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (float(lat1), float(lon1), float(lat2), float(lon2)))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        value, value_range = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits <<= 1
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            geohash.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(geohash)
+
+
+def cell_size(precision):
+    lat_bits = (5 * precision) // 2
+    lon_bits = 5 * precision - lat_bits
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    latitude, longitude = float(latitude), float(longitude)
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(latitude))
+    lon_delta = 180.0 if cos_lat < 1e-6 else min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lon_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lon_delta, 180.0),
+    )
+
+
+def _cells_for_bbox(south, west, north, east, precision):
+    height, width = cell_size(precision)
+    lat_start = math.floor((south + 90.0) / height)
+    lat_end = math.floor((min(north, 89.999999) + 90.0) / height)
+    lon_start = math.floor((west + 180.0) / width)
+    lon_end = math.floor((min(east, 179.999999) + 180.0) / width)
+    count = (lat_end - lat_start + 1) * (lon_end - lon_start + 1)
+    if count > MAX_COVER_CELLS:
+        return None
+
+    cells = set()
+    for lat_index in range(lat_start, lat_end + 1):
+        for lon_index in range(lon_start, lon_end + 1):
+            # Encode the centre of each grid cell
+            cells.add(encode_geohash(
+                lat_index * height - 90.0 + height / 2,
+                lon_index * width - 180.0 + width / 2,
+                precision
+            ))
+    return cells
+
+
+def covering_geohashes(south, west, north, east):
+    """Smallest set of geohash prefixes (at most MAX_COVER_CELLS) covering the box."""
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cells = _cells_for_bbox(south, west, north, east, precision)
+        if cells is not None:
+            return sorted(cells)
+    return []
+
+
+def filter_within_bbox(queryset, south, west, north, east):
+    prefix_filter = Q()
+    for prefix in covering_geohashes(south, west, north, east):
+        prefix_filter |= Q(geohash__startswith=prefix)
+
+    # Prefix cells narrow the scan through the geohash index; the exact box trims the edges
+    return queryset.filter(prefix_filter).filter(
+        latitude__gte=south, latitude__lte=north,
+        longitude__gte=west, longitude__lte=east,
+    )
+
+
+def annotate_distance(queryset, latitude, longitude):
+    lat = math.radians(float(latitude))
+    lon = math.radians(float(longitude))
+    dlat = Radians(F('latitude')) - Value(lat)
+    dlon = Radians(F('longitude')) - Value(lon)
+    a = (Power(Sin(dlat / 2), 2) +
+         Value(math.cos(lat)) * Cos(Radians(F('latitude'))) * Power(Sin(dlon / 2), 2))
+    return queryset.annotate(
+        distance_km=ExpressionWrapper(
+            2 * EARTH_RADIUS_KM * ASin(Sqrt(a)), output_field=FloatField()
+        )
+    )
+
+
+def filter_within_radius(queryset, latitude, longitude, radius_km):
+    queryset = filter_within_bbox(queryset, *bounding_box(latitude, longitude, radius_km))
+    return annotate_distance(queryset, latitude, longitude).filter(distance_km__lte=radius_km)
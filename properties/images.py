@@ -0,0 +1,65 @@
+import io
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+from core.page_cache import LISTINGS_TAG, invalidate_tags, property_tag
+from .models import Property
+
+# Variant name -> maximum width in pixels
+VARIANTS = {
+    'thumbnail': 320,
+    'card': 640,
+    'hero': 1600,
+}
+VARIANT_FORMAT = 'WEBP'
+VARIANT_EXTENSION = 'webp'
+VARIANT_QUALITY = 80
+
+
+def variant_path(image_obj, name):
+    return f'property_images/variants/{image_obj.pk}/{name}.{VARIANT_EXTENSION}'
+
+
+def _render_variant(source, width):
+    if source.width > width:
+        height = round(source.height * width / source.width)
+        resized = source.resize((width, height), Image.LANCZOS)
+    else:
+        # Never upscale; re-encoding still drops metadata and shrinks the file
+        resized = source.copy()
+
+    buffer = io.BytesIO()
+    # Saving a fresh image without exif/icc arguments writes no metadata
+    resized.save(buffer, VARIANT_FORMAT, quality=VARIANT_QUALITY, method=4)
+    return resized.size, buffer.getvalue()
+
+
+def generate_variants(image_obj):
+    """Write resized, metadata-free WebP variants of a PropertyImage and record them on the row."""
+    with image_obj.image.open('rb') as f:
+        source = Image.open(f)
+        # Bake the camera orientation into the pixels before the EXIF data is dropped
+        source = ImageOps.exif_transpose(source)
+        source = source.convert('RGBA' if source.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    variants = {}
+    for name, width in VARIANTS.items():
+        (variant_width, variant_height), data = _render_variant(source, width)
+        path = variant_path(image_obj, name)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        saved_path = default_storage.save(path, ContentFile(data))
+        variants[name] = {'name': saved_path, 'width': variant_width, 'height': variant_height}
+
+    type(image_obj).objects.filter(pk=image_obj.pk).update(variants=variants)
+    image_obj.variants = variants
+    # update() sends no signals; cached cards key on updated_at and should pick up the new srcset
+    Property.objects.filter(pk=image_obj.property_id).update(updated_at=timezone.now())
+    invalidate_tags(LISTINGS_TAG, property_tag(image_obj.property_id))
+    return variants
+
+
+def delete_variants(image_obj):
+    for variant in (image_obj.variants or {}).values():
+        default_storage.delete(variant['name'])
@@ -0,0 +1,192 @@
+import csv
+import json
+from django import forms as django_forms
+from django.db import transaction
+from core.page_cache import LISTINGS_TAG, invalidate_tags
+from core.stats import ACTIVE_LANDLORDS, ACTIVE_PROPERTIES, adjust_site_stats
+from .forms import PropertyImportForm
+from .geo import encode_geohash
+from .models import Amenity, Property
+from .search import update_search_vectors
+from .search_cache import search_cache
+from .similarity import queue_neighbor_refresh
+
+CHUNK_SIZE = 500
+# Rows with errors beyond this are counted but not kept in memory
+MAX_REPORTED_ERRORS = 1000
+
+FALSE_VALUES = {'', '0', 'false', 'f', 'no', 'n', 'off'}
+FORMATS = ('csv', 'jsonl')
+
+
+def detect_format(filename):
+    name = (filename or '').lower()
+    if name.endswith('.jsonl') or name.endswith('.ndjson'):
+        return 'jsonl'
+    return 'csv'
+
+
+NOT_UTF8 = 'This row is not valid UTF-8 text; save the file as UTF-8 and import it again.'
+
+
+def _decoded_lines(fileobj, bad_lines):
+    # Decoding line by line lets one badly encoded row fail on its own
+    for line_num, line in enumerate(fileobj, start=1):
+        try:
+            yield line.decode('utf-8-sig' if line_num == 1 else 'utf-8')
+        except UnicodeDecodeError:
+            bad_lines.add(line_num)
+            yield line.decode('utf-8', errors='replace')
+
+
+def iter_rows(fileobj, fmt):
+    """Yield (line number, row dict or None, error) from a binary CSV/JSONL stream, one row at a time."""
+    bad_lines = set()
+    lines = _decoded_lines(fileobj, bad_lines)
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        last_line = 1
+        for row in reader:
+            # A quoted field can span several lines
+            first_line, last_line = last_line + 1, reader.line_num
+            if bad_lines.intersection(range(first_line, last_line + 1)):
+                yield last_line, None, NOT_UTF8
+                continue
+            yield last_line, row, None
+    else:
+        for line_num, line in enumerate(lines, start=1):
+            if line_num in bad_lines:
+                yield line_num, None, NOT_UTF8
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_num, None, f'Invalid JSON: {exc}'
+                continue
+            if not isinstance(row, dict):
+                yield line_num, None, 'Each line must be a JSON object.'
+                continue
+            yield line_num, row, None
+
+
+def _normalize_row(row, boolean_fields):
+    data = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        if isinstance(value, list):
+            value = ', '.join(str(item) for item in value)
+        if isinstance(value, str):
+            value = value.strip()
+        if key in boolean_fields:
+            value = str(value).lower() not in FALSE_VALUES if value is not None else False
+            if not value:
+                # Unchecked checkboxes are simply absent from form data
+                continue
+        data[key] = value
+    return data
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+
+class PropertyImporter:
+    """
+    Validates rows with PropertyImportForm (PropertyForm's rules plus
+    coordinates) and inserts them with ``bulk_create`` one chunk per
+    transaction, so only ``chunk_size`` rows are ever held in memory.
+    """
+
+    def __init__(self, landlord, chunk_size=CHUNK_SIZE, on_error=None, on_chunk=None):
+        self.landlord = landlord
+        self.chunk_size = chunk_size
+        self.on_error = on_error
+        self.on_chunk = on_chunk
+        self.result = ImportResult()
+        self.boolean_fields = {
+            name for name, field in PropertyImportForm.base_fields.items()
+            if isinstance(field, django_forms.BooleanField)
+        }
+        self._had_active_listing = Property.objects.filter(landlord=landlord, is_active=True).exists()
+
+    def run(self, rows):
+        batch = []
+        for line, row, error in rows:
+            if error:
+                self._error(line, {'__all__': [error]})
+                continue
+
+            form = PropertyImportForm(data=_normalize_row(row, self.boolean_fields))
+            if not form.is_valid():
+                self._error(line, {field: list(messages) for field, messages in form.errors.items()})
+                continue
+
+            property_obj = form.save(commit=False)
+            property_obj.landlord = self.landlord
+            amenities = [a.strip() for a in form.cleaned_data.get('amenities', '').split(',') if a.strip()]
+            batch.append((property_obj, amenities))
+
+            if len(batch) >= self.chunk_size:
+                self._flush(batch)
+                batch = []
+
+        if batch:
+            self._flush(batch)
+        return self.result
+
+    def _error(self, line, errors):
+        self.result.add_error(line, errors)
+        if self.on_error:
+            self.on_error(line, errors)
+
+    def _flush(self, batch):
+        properties = [property_obj for property_obj, amenities in batch]
+        for property_obj in properties:
+            # bulk_create skips save() and its signals, so derive what they would have set
+            if property_obj.latitude is not None and property_obj.longitude is not None:
+                property_obj.geohash = encode_geohash(property_obj.latitude, property_obj.longitude)
+
+        with transaction.atomic():
+            Property.objects.bulk_create(properties, batch_size=self.chunk_size)
+            Amenity.objects.bulk_create([
+                Amenity(property=property_obj, name=name)
+                for property_obj, amenities in batch
+                for name in amenities
+            ], batch_size=self.chunk_size)
+            update_search_vectors(Property.objects.filter(pk__in=[p.pk for p in properties]))
+            # post_save would have refreshed each listing's similar properties
+            queue_neighbor_refresh([p.pk for p in properties])
+
+            active = sum(1 for p in properties if p.is_active)
+            first_listing = bool(active) and not self._had_active_listing
+            adjust_site_stats(**{
+                ACTIVE_PROPERTIES: active,
+                ACTIVE_LANDLORDS: 1 if first_listing else 0,
+            })
+            self._had_active_listing = self._had_active_listing or bool(active)
+
+        for key in {(p.city, p.property_type) for p in properties}:
+            search_cache.invalidate(*key)
+        invalidate_tags(LISTINGS_TAG)
+
+        self.result.created += len(properties)
+        if self.on_chunk:
+            self.on_chunk(self.result)
+
+
+def import_properties(fileobj, landlord, fmt='csv', **kwargs):
+    if fmt not in FORMATS:
+        raise ValueError(f'Unsupported import format: {fmt}')
+    return PropertyImporter(landlord, **kwargs).run(iter_rows(fileobj, fmt))
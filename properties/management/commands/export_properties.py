@@ -0,0 +1,32 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from properties.export import FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = ('Stream active verified listings as JSONL or CSV; with --updated-since, every listing '
+            'changed since then, flagged active or not')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument('--updated-since', help='ISO 8601 timestamp; only listings updated after it, including tombstones')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--output', help='File to write; defaults to stdout')
+
+    def handle(self, *args, **options):
+        updated_since = None
+        if options['updated_since']:
+            updated_since = parse_datetime(options['updated_since'])
+            if updated_since is None:
+                raise CommandError('--updated-since must be an ISO 8601 timestamp')
+
+        chunks = stream_export(options['format'], updated_since, compress=options['gzip'])
+        if options['output']:
+            with open(options['output'], 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
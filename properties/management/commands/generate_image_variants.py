@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from housing.celery import enqueue
+from properties.images import generate_variants
+from properties.models import PropertyImage
+from properties.tasks import generate_image_variants_task
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP variants for existing property images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Regenerate variants for images that already have them')
+        parser.add_argument('--async', action='store_true', dest='use_worker',
+                            help='Queue the work on the Celery worker instead of running it here')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        images = PropertyImage.objects.order_by('pk')
+        if not options['all']:
+            images = images.filter(variants={})
+
+        processed = 0
+        failed = 0
+        last_pk = 0
+        while True:
+            batch = list(images.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            for image in batch:
+                if options['use_worker']:
+                    enqueue(generate_image_variants_task, image.pk)
+                else:
+                    try:
+                        generate_variants(image)
+                    except (OSError, ValueError) as exc:
+                        failed += 1
+                        self.stderr.write(f'Image {image.pk}: {exc}')
+                        continue
+                processed += 1
+
+        verb = 'Queued' if options['use_worker'] else 'Processed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {processed} images ({failed} failed)'))
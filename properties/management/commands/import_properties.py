@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from properties.importer import CHUNK_SIZE, FORMATS, detect_format, import_properties
+
+
+class Command(BaseCommand):
+    help = 'Stream-import property listings for a landlord from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--landlord', required=True, help='Username of the owning landlord')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            landlord = User.objects.get(username=options['landlord'], user_type='landlord')
+        except User.DoesNotExist:
+            raise CommandError(f"No landlord named {options['landlord']}")
+
+        fmt = options['format'] or detect_format(options['path'])
+
+        def report_error(line, errors):
+            for field, messages in errors.items():
+                self.stderr.write(f"Line {line}: {field}: {' '.join(messages)}")
+
+        def report_progress(result):
+            self.stdout.write(f'{result.created} imported, {result.failed} rejected')
+
+        try:
+            with open(options['path'], 'rb') as f:
+                result = import_properties(
+                    f, landlord, fmt=fmt,
+                    chunk_size=options['chunk_size'],
+                    on_error=report_error,
+                    on_chunk=report_progress
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} properties; {result.failed} rows rejected'
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from properties.models import Property, SimilarProperty
+from properties.similarity import refresh_similar_properties
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed similar-properties list for every listing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        # Lists of listings that are no longer recommendable go first
+        SimilarProperty.objects.exclude(property__is_active=True, property__is_verified=True).delete()
+
+        last_pk = None
+        total = 0
+        while True:
+            batch = Property.objects.filter(is_active=True, is_verified=True).order_by('pk')
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            properties = list(batch[:batch_size])
+            if not properties:
+                break
+
+            for prop in properties:
+                refresh_similar_properties(prop)
+            total += len(properties)
+            last_pk = properties[-1].pk
+            self.stdout.write(f'{total} properties processed')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt similar properties for {total} listings'))
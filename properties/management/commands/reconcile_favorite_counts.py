@@ -0,0 +1,62 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from properties.models import FavoriteProperty, Property
+
+
+class Command(BaseCommand):
+    help = 'Recompute Property.favorite_count from FavoriteProperty rows for drifted properties'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches to limit load')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        actual_count = Coalesce(
+            Subquery(
+                FavoriteProperty.objects.filter(property=OuterRef('pk'))
+                .order_by()
+                .values('property')
+                .annotate(total=Count('pk'))
+                .values('total'),
+                output_field=IntegerField()
+            ),
+            Value(0)
+        )
+
+        last_pk = None
+        checked = 0
+        fixed = 0
+
+        # Walk the table in primary-key chunks; each chunk is its own short statement,
+        # so nothing holds locks beyond the handful of drifted rows being corrected
+        while True:
+            batch = Property.objects.order_by('pk')
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            pks = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            last_pk = pks[-1]
+            checked += len(pks)
+
+            drifted = list(
+                Property.objects.filter(pk__in=pks)
+                .annotate(actual=actual_count)
+                .exclude(favorite_count=F('actual'))
+                .values_list('pk', flat=True)
+            )
+            if drifted and not options['dry_run']:
+                # Recount inside the UPDATE so concurrent toggles are not overwritten
+                Property.objects.filter(pk__in=drifted).update(favorite_count=actual_count)
+            fixed += len(drifted)
+
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        action = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} properties. {action} {fixed} drifted counts.'))
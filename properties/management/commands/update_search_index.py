@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from properties.models import Property
+from properties.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search document for every property'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = None
+        total = 0
+
+        while True:
+            batch = Property.objects.order_by('pk')
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            pks = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+
+            total += update_search_vectors(Property.objects.filter(pk__in=pks))
+            last_pk = pks[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} properties'))
@@ -0,0 +1,245 @@
+import datetime
+import logging
+import threading
+import time
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from .facets import AMENITY_FACETS
+from .models import Property
+
+logger = logging.getLogger(__name__)
+
+AMENITY_FIELDS = [field for field, label in AMENITY_FACETS]
+ROOM_TYPES = [value for value, label in Property.ROOM_TYPE_CHOICES]
+
+SNAPSHOT_FIELDS = [
+    'id', 'price_per_month', 'available_from', 'available_to', 'room_type',
+    'city', 'nearest_university', 'distance_to_university', 'is_active', 'is_verified',
+] + AMENITY_FIELDS
+
+WEIGHTS = {
+    'budget': 0.35,
+    'location': 0.25,
+    'availability': 0.15,
+    'room_type': 0.15,
+    'distance': 0.05,
+    'amenities': 0.05,
+}
+
+# Open-ended availability is stored as a far-future ordinal
+NO_END = datetime.date.max.toordinal()
+
+
+class ListingSnapshot:
+    """
+    Columnar, in-memory copy of the listing attributes used for match
+    scoring. A daemon thread started with the worker (see ``start``) loads
+    every property, then every ``refresh_interval`` re-reads the rows whose
+    ``updated_at`` moved since the last refresh and patches them in place,
+    with a periodic full reload to drop deleted rows. Requests only read it.
+
+    Each incremental refresh reaches ``overlap`` seconds further back than
+    the previous one started: a row saved in a transaction that commits
+    after the refresh has read still carries an ``updated_at`` from before
+    it, and must be picked up by the next one.
+    """
+
+    def __init__(self, refresh_interval=60, rebuild_interval=3600, overlap=300):
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.overlap = datetime.timedelta(seconds=overlap)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._refreshed_at = None
+        self._rebuilt_at = 0
+        self._reset()
+
+    @property
+    def loaded(self):
+        return self._refreshed_at is not None
+
+    def _reset(self):
+        self.ids = []
+        self.index = {}
+        self.price = np.empty(0, dtype=np.float64)
+        self.available_from = np.empty(0, dtype=np.int64)
+        self.available_to = np.empty(0, dtype=np.int64)
+        self.room_type = np.empty(0, dtype=np.int8)
+        self.city = np.empty(0, dtype=np.int32)
+        self.university = np.empty(0, dtype=np.int32)
+        self.distance = np.empty(0, dtype=np.float64)
+        self.amenities = np.empty((0, len(AMENITY_FIELDS)), dtype=bool)
+        self.listed = np.empty(0, dtype=bool)
+        # Distinct lowercase city/university names; the columns hold their codes
+        self.city_names = {}
+        self.university_names = {}
+
+    def start(self):
+        """Start the refresh thread of this process, if it is not running yet."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='listing-snapshot', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception('Failed to refresh the listing snapshot')
+            finally:
+                connection.close()
+            time.sleep(self.refresh_interval)
+
+    def refresh(self):
+        now = time.monotonic()
+        full = self._refreshed_at is None or now - self._rebuilt_at >= self.rebuild_interval
+        started = timezone.now()
+        rows = Property.objects.order_by()
+        if not full:
+            rows = rows.filter(updated_at__gte=self._refreshed_at - self.overlap)
+        # Read outside the lock so scoring requests never wait on the database
+        rows = list(rows.values_list(*SNAPSHOT_FIELDS))
+        with self._lock:
+            if full:
+                self._reset()
+            self._apply(rows)
+            self._refreshed_at = started
+        if full:
+            self._rebuilt_at = now
+
+    def _code(self, names, value):
+        return names.setdefault((value or '').strip().lower(), len(names))
+
+    def _apply(self, rows):
+        new_rows = [row for row in rows if row[0] not in self.index]
+        if new_rows:
+            start = len(self.ids)
+            for offset, row in enumerate(new_rows):
+                self.index[row[0]] = start + offset
+                self.ids.append(row[0])
+            extra = len(new_rows)
+            self.price = np.concatenate([self.price, np.zeros(extra)])
+            self.available_from = np.concatenate([self.available_from, np.zeros(extra, dtype=np.int64)])
+            self.available_to = np.concatenate([self.available_to, np.zeros(extra, dtype=np.int64)])
+            self.room_type = np.concatenate([self.room_type, np.zeros(extra, dtype=np.int8)])
+            self.city = np.concatenate([self.city, np.zeros(extra, dtype=np.int32)])
+            self.university = np.concatenate([self.university, np.zeros(extra, dtype=np.int32)])
+            self.distance = np.concatenate([self.distance, np.zeros(extra)])
+            self.amenities = np.concatenate([self.amenities, np.zeros((extra, len(AMENITY_FIELDS)), dtype=bool)])
+            self.listed = np.concatenate([self.listed, np.zeros(extra, dtype=bool)])
+
+        for row in rows:
+            (pk, price, available_from, available_to, room_type, city, university,
+             distance, is_active, is_verified, *amenities) = row
+            i = self.index[pk]
+            self.price[i] = float(price)
+            self.available_from[i] = available_from.toordinal()
+            self.available_to[i] = available_to.toordinal() if available_to else NO_END
+            self.room_type[i] = ROOM_TYPES.index(room_type) if room_type in ROOM_TYPES else -1
+            self.city[i] = self._code(self.city_names, city)
+            self.university[i] = self._code(self.university_names, university)
+            self.distance[i] = float(distance)
+            self.amenities[i] = amenities
+            self.listed[i] = is_active and is_verified
+
+    def _matching_codes(self, names, term):
+        return np.fromiter((code for name, code in names.items() if term in name), dtype=np.int32)
+
+    def score(self, budget_min=None, budget_max=None, location='', room_type='', move_in_date=None):
+        """Score every listed property against a set of preferences; returns (scores, mask)."""
+        total = np.zeros(len(self.ids))
+        weight = 0.0
+
+        if budget_max:
+            budget_max = float(budget_max)
+            budget_min = float(budget_min or 0)
+            # Full marks inside the budget, tapering to zero at 50% over it
+            over = np.clip((self.price - budget_max) / budget_max, 0, 0.5) / 0.5
+            fit = 1 - over
+            fit = np.where(self.price < budget_min, 0.8, fit)
+            total += WEIGHTS['budget'] * fit
+            weight += WEIGHTS['budget']
+
+        location = (location or '').strip().lower()
+        if location:
+            in_city = np.isin(self.city, self._matching_codes(self.city_names, location))
+            near_university = np.isin(self.university, self._matching_codes(self.university_names, location))
+            total += WEIGHTS['location'] * (in_city | near_university)
+            weight += WEIGHTS['location']
+
+        room_code = _room_type_code(room_type)
+        if room_code is not None:
+            total += WEIGHTS['room_type'] * (self.room_type == room_code)
+            weight += WEIGHTS['room_type']
+
+        if move_in_date:
+            move_in = move_in_date.toordinal()
+            # Available on the day scores 1; a later start decays over ~2 months
+            wait_days = np.clip(self.available_from - move_in, 0, None)
+            fit = np.exp(-wait_days / 60.0)
+            fit = np.where(self.available_to < move_in, 0.0, fit)
+            total += WEIGHTS['availability'] * fit
+            weight += WEIGHTS['availability']
+
+        total += WEIGHTS['distance'] * np.exp(-self.distance / 5.0)
+        total += WEIGHTS['amenities'] * self.amenities.mean(axis=1)
+        weight += WEIGHTS['distance'] + WEIGHTS['amenities']
+
+        return total / weight, self.listed
+
+    def top_matches(self, limit, **preferences):
+        with self._lock:
+            scores, mask = self.score(**preferences)
+            scores = np.where(mask, scores, -1.0)
+            count = min(limit, int(mask.sum()))
+            if count == 0:
+                return []
+            top = np.argpartition(-scores, count - 1)[:count]
+            top = top[np.argsort(-scores[top])]
+            return [(self.ids[i], float(scores[i])) for i in top]
+
+
+def _room_type_code(preference):
+    preference = (preference or '').strip().lower()
+    if not preference:
+        return None
+    for code, (value, label) in enumerate(Property.ROOM_TYPE_CHOICES):
+        if preference in (value, label.lower()):
+            return code
+    return None
+
+
+listing_snapshot = ListingSnapshot(
+    refresh_interval=getattr(settings, 'MATCH_SNAPSHOT_REFRESH_INTERVAL', 60),
+    rebuild_interval=getattr(settings, 'MATCH_SNAPSHOT_REBUILD_INTERVAL', 3600),
+    overlap=getattr(settings, 'MATCH_SNAPSHOT_OVERLAP', 300),
+)
+
+
+def get_matches_for_profile(profile, limit=6):
+    """Top ``limit`` active listings for a StudentProfile, best match first; none until the snapshot loads."""
+    # Workers start the refresh thread when they boot; this covers servers without that hook
+    listing_snapshot.start()
+    if not listing_snapshot.loaded:
+        return []
+    # Over-fetch so listings deleted since the last refresh can be skipped
+    matches = listing_snapshot.top_matches(
+        limit * 2,
+        budget_min=profile.budget_min,
+        budget_max=profile.budget_max,
+        location=profile.preferred_location,
+        room_type=profile.room_type_preference,
+        move_in_date=profile.move_in_date,
+    )
+    scores = dict(matches)
+    properties = Property.objects.filter(
+        pk__in=scores, is_active=True, is_verified=True
+    ).with_primary_image()
+    properties = sorted(properties, key=lambda prop: scores[prop.pk], reverse=True)[:limit]
+    for prop in properties:
+        prop.match_score = round(scores[prop.pk] * 100)
+    return properties
@@ -1,8 +1,33 @@
 from django.db import models
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.files.storage import default_storage
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from accounts.models import User
+import builtins
+import datetime
 import uuid
 
+def primary_image_prefetch():
+    # One row per property: its primary image, else its earliest upload (DISTINCT ON)
+    return Prefetch(
+        'images',
+        queryset=PropertyImage.objects.order_by('property_id', '-is_primary', 'uploaded_at').distinct('property_id'),
+        to_attr='prefetched_primary_images'
+    )
+
+def prefetch_primary_images(properties):
+    """Resolve ``primary_image`` for a list of properties in a single query."""
+    prefetch_related_objects(list(properties), primary_image_prefetch())
+    return properties
+
+class PropertyQuerySet(models.QuerySet):
+    def with_primary_image(self):
+        return self.prefetch_related(primary_image_prefetch())
+
 class Property(models.Model):
     PROPERTY_TYPE_CHOICES = (
         ('apartment', 'Apartment'),
@@ -34,6 +59,7 @@ class Property(models.Model):
     country = models.CharField(max_length=100, default='US')
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
     
     # Pricing
     price_per_month = models.DecimalField(max_digits=10, decimal_places=2)
@@ -76,23 +102,76 @@ class Property(models.Model):
     view_count = models.IntegerField(default=0)
     favorite_count = models.IntegerField(default=0)
     
+    # Search
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PropertyQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = "Properties"
+        indexes = [
+            GinIndex(fields=['search_vector'], name='property_search_vector_idx'),
+            models.Index(
+                fields=['-is_verified', '-created_at', '-id'],
+                name='property_list_keyset_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # Serve the city__iexact / nearest_university__iexact lookups of similarity candidates
+            models.Index(Upper('city'), name='property_city_upper_idx'),
+            models.Index(Upper('nearest_university'), name='property_university_upper_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.city}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember loaded values so save handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def get_loaded_value(self, field_name):
+        return getattr(self, '_loaded_values', {}).get(field_name)
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save handlers have seen the old values; the saved ones are the baseline now
+        update_fields = kwargs.get('update_fields')
+        fields = [f for f in self._meta.concrete_fields if not update_fields or f.name in update_fields]
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{f.attname: getattr(self, f.attname) for f in fields},
+        }
+    
     def get_absolute_url(self):
         from django.urls import reverse
         return reverse('property_detail', args=[str(self.id)])
     
     @property
     def primary_image(self):
-        return self.images.filter(is_primary=True).first() or self.images.first()
+        if not hasattr(self, '_primary_image'):
+            if hasattr(self, 'prefetched_primary_images'):
+                images = self.prefetched_primary_images
+                self._primary_image = images[0] if images else None
+            elif 'images' in getattr(self, '_prefetched_objects_cache', {}):
+                # Full image list already loaded; PropertyImage ordering puts the primary first
+                images = self.images.all()
+                self._primary_image = images[0] if images else None
+            else:
+                self._primary_image = self.images.filter(is_primary=True).first() or self.images.first()
+        return self._primary_image
+    
+    def get_view_history(self, days=30):
+        """Daily view counts for the last ``days`` days, oldest first, zero-filled."""
+        today = timezone.localdate()
+        start = today - datetime.timedelta(days=days - 1)
+        counts = dict(self.daily_views.filter(date__gte=start).values_list('date', 'views'))
+        return [(start + datetime.timedelta(days=i), counts.get(start + datetime.timedelta(days=i), 0)) for i in range(days)]
     
     @property
     def display_price(self):
@@ -126,10 +205,37 @@ class PropertyImage(models.Model):
     image = models.ImageField(upload_to='property_images/')
     is_primary = models.BooleanField(default=False)
     caption = models.CharField(max_length=255, blank=True)
+    # Resized WebP derivatives: name -> {'name': storage path, 'width': ..., 'height': ...}
+    variants = models.JSONField(default=dict, blank=True, editable=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-is_primary', 'uploaded_at']
+    
+    def variant_url(self, name):
+        """URL of a resized variant, or of the original until the variants are generated."""
+        variant = self.variants.get(name)
+        if variant:
+            return default_storage.url(variant['name'])
+        return self.image.url
+    
+    # ``property`` is the foreign key inside this class body
+    @builtins.property
+    def thumbnail_url(self):
+        return self.variant_url('thumbnail')
+    
+    @builtins.property
+    def card_url(self):
+        return self.variant_url('card')
+    
+    @builtins.property
+    def hero_url(self):
+        return self.variant_url('hero')
+    
+    @builtins.property
+    def srcset(self):
+        variants = sorted(self.variants.values(), key=lambda variant: variant['width'])
+        return ', '.join(f"{default_storage.url(variant['name'])} {variant['width']}w" for variant in variants)
 
 class PropertyVideo(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='videos')
@@ -145,6 +251,38 @@ class Amenity(models.Model):
     class Meta:
         verbose_name_plural = "Amenities"
 
+class PropertyViewDaily(models.Model):
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='daily_views')
+    date = models.DateField()
+    views = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['property', 'date']
+        ordering = ['-date']
+
+class SimilarProperty(models.Model):
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='similar_properties')
+    neighbor = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='similar_to')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    
+    class Meta:
+        unique_together = ['property', 'neighbor']
+        ordering = ['property', 'rank']
+        indexes = [
+            models.Index(fields=['property', 'rank'], name='similar_property_rank_idx'),
+        ]
+
+class PendingSimilarityRefresh(models.Model):
+    """A listing whose similar-properties list the next batched refresh must re-rank."""
+    property = models.OneToOneField(Property, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    requested_at = models.DateTimeField(auto_now_add=True)
+
+class DeletedProperty(models.Model):
+    """Tombstone for a hard-deleted listing, so incremental feed consumers can drop it."""
+    property_id = models.UUIDField(primary_key=True)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
 class FavoriteProperty(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorites')
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='favorited_by')
@@ -0,0 +1,130 @@
+import hashlib
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+# Ordering the property list must use for cursors to apply
+KEYSET_ORDERING = ['-is_verified', '-created_at', '-id']
+
+CURSOR_SALT = 'properties.pagination.cursor'
+COUNT_CACHE_TIMEOUT = 300
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(obj, direction):
+    return signing.dumps(
+        [direction, obj.is_verified, obj.created_at.isoformat(), str(obj.pk)],
+        salt=CURSOR_SALT,
+        compress=True
+    )
+
+
+def decode_cursor(token):
+    try:
+        direction, is_verified, created_at, pk = signing.loads(token, salt=CURSOR_SALT)
+    except (signing.BadSignature, ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    created_at = parse_datetime(created_at)
+    if direction not in ('next', 'prev') or created_at is None:
+        raise InvalidCursor('Invalid cursor')
+    return direction, is_verified, created_at, pk
+
+
+def cached_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    sql, params = queryset.query.sql_with_params()
+    key = 'properties:count:' + hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+    return cache.get_or_set(key, queryset.count, timeout)
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1], 'next')
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0], 'prev')
+        return None
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over ``KEYSET_ORDERING``. Pages are fetched with a
+    seek predicate on (is_verified, created_at, id) instead of OFFSET, and
+    the total is a cached COUNT rather than one per request.
+    """
+    is_keyset = True
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    @cached_property
+    def count(self):
+        return cached_count(self.queryset)
+
+    @cached_property
+    def num_pages(self):
+        return max(1, -(-self.count // self.per_page))
+
+    def page(self, cursor=None):
+        if not cursor:
+            rows = list(self.queryset.order_by(*KEYSET_ORDERING)[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, len(rows) > self.per_page, False)
+
+        direction, is_verified, created_at, pk = decode_cursor(cursor)
+        if direction == 'next':
+            # Rows after the cursor in descending key order
+            seek = (Q(is_verified__lt=is_verified) |
+                    Q(is_verified=is_verified, created_at__lt=created_at) |
+                    Q(is_verified=is_verified, created_at=created_at, id__lt=pk))
+            rows = list(self.queryset.filter(seek).order_by(*KEYSET_ORDERING)[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, len(rows) > self.per_page, True)
+
+        # Rows before the cursor: walk the index backwards, then restore display order
+        seek = (Q(is_verified__gt=is_verified) |
+                Q(is_verified=is_verified, created_at__gt=created_at) |
+                Q(is_verified=is_verified, created_at=created_at, id__gt=pk))
+        reverse_ordering = [field.lstrip('-') for field in KEYSET_ORDERING]
+        rows = list(self.queryset.filter(seek).order_by(*reverse_ordering)[:self.per_page + 1])
+        page_rows = rows[:self.per_page]
+        page_rows.reverse()
+        return KeysetPage(page_rows, self, True, len(rows) > self.per_page)
+
+
+class CachedCountPaginator(Paginator):
+    """Offset paginator whose total comes from ``cached_count``."""
+
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list)
@@ -0,0 +1,41 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F
+
+SEARCH_CONFIG = 'english'
+
+# Fields feeding the search document; saves touching none of them skip the re-index
+SEARCH_FIELDS = ('title', 'nearest_university', 'city', 'description', 'address')
+
+
+def property_search_vector():
+    # Title outranks university/city, which outrank the free-text description
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('nearest_university', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('city', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('description', weight='C', config=SEARCH_CONFIG) +
+        SearchVector('address', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def build_search_query(query):
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return None
+    # Every term must match; each one as a prefix so partial words still hit
+    raw_query = ' & '.join(f'{term}:*' for term in terms)
+    return SearchQuery(raw_query, search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_properties(queryset, query):
+    search_query = build_search_query(query)
+    if search_query is None:
+        return queryset
+    return queryset.filter(search_vector=search_query).annotate(
+        search_rank=SearchRank(F('search_vector'), search_query)
+    )
+
+
+def update_search_vectors(queryset):
+    return queryset.update(search_vector=property_search_vector())
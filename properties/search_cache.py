@@ -0,0 +1,138 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+ANY = '*'
+TAG_KEY = 'search_cache:tag:{}|{}'
+TERMS_KEY = 'search_cache:city_terms'
+
+
+def canonical_params(cleaned_data):
+    """Normalized, order-independent representation of a search form state."""
+    params = {}
+    for name, value in cleaned_data.items():
+        if value in (None, '', False):
+            continue
+        if isinstance(value, str):
+            value = ' '.join(value.lower().split())
+            if not value:
+                continue
+        elif isinstance(value, Decimal):
+            value = str(value.normalize())
+        elif isinstance(value, float):
+            value = round(value, 6)
+        elif isinstance(value, tuple):
+            value = [round(v, 6) if isinstance(v, float) else v for v in value]
+        params[name] = value
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class SearchResultCache:
+    """
+    Per-process LRU of ordered property ID lists keyed by search parameters.
+
+    Each search is tagged with the city term and property type it filtered
+    on (or ``ANY``), and the tag's version, kept in the shared cache like
+    ``core.page_cache`` tag versions, is folded into its key. Saving a
+    property bumps the versions of the tags that could match it, so every
+    process stops serving those entries; they age out of the LRU.
+
+    City filters are substring matches, so the city terms searched recently
+    are listed in the shared cache too, for invalidation to find the ones a
+    saved city contains.
+    """
+
+    def __init__(self, max_entries=500, timeout=60, max_ids=2000):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.max_ids = max_ids
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def tags_for(city=None, property_type=None):
+        return ' '.join(city.lower().split()) if city else ANY, property_type or ANY
+
+    def make_key(self, cleaned_data):
+        city_tag, type_tag = self.tags_for(cleaned_data.get('city'), cleaned_data.get('property_type'))
+        tag = TAG_KEY.format(city_tag, type_tag)
+        cache.add(tag, time.time(), self.timeout)
+        version = cache.get(tag) or 0
+        return hashlib.sha1(f'{canonical_params(cleaned_data)}|{version}'.encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, ids, city=None, property_type=None):
+        city_tag, type_tag = self.tags_for(city, property_type)
+        if city_tag != ANY:
+            self._register_term(city_tag)
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.timeout, list(ids))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _register_term(self, term):
+        now = time.time()
+        terms = cache.get(TERMS_KEY) or {}
+        # Refresh at most every half timeout; terms nobody searched for a while are dropped
+        if now - terms.get(term, 0) < self.timeout / 2:
+            return
+        terms = {known: seen for known, seen in terms.items() if now - seen < self.timeout}
+        terms[term] = now
+        cache.set(TERMS_KEY, terms, None)
+
+    def invalidate(self, city, property_type):
+        """Bump the tags ``city``/``property_type`` could match once the transaction commits."""
+        city = ' '.join((city or '').lower().split())
+
+        def bump():
+            terms = [term for term in (cache.get(TERMS_KEY) or {}) if term in city] + [ANY]
+            tags = [TAG_KEY.format(term, type_tag) for term in terms for type_tag in {property_type or ANY, ANY}]
+            # Versions only need to outlive the entries keyed on them
+            cache.set_many({tag: time.time() for tag in tags}, self.timeout)
+            with self._lock:
+                self.invalidations += 1
+        transaction.on_commit(bump)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+search_cache = SearchResultCache(**getattr(settings, 'PROPERTY_SEARCH_CACHE', {}))
@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .geo import encode_geohash
+from housing.celery import enqueue
+from .images import delete_variants
+from .models import DeletedProperty, Property, PropertyImage
+from .search import SEARCH_FIELDS, update_search_vectors
+from .search_cache import search_cache
+from core.page_cache import LISTINGS_TAG, invalidate_tags, property_tag
+
+
+@receiver(pre_save, sender=Property)
+def set_geohash(sender, instance, **kwargs):
+    if instance.latitude is not None and instance.longitude is not None:
+        instance.geohash = encode_geohash(instance.latitude, instance.longitude)
+    else:
+        instance.geohash = ''
+
+
+@receiver(post_save, sender=Property)
+def refresh_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    update_search_vectors(Property.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Property)
+def invalidate_search_cache(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'view_count', 'favorite_count'}:
+        return
+    search_cache.invalidate(instance.city, instance.property_type)
+    
+    # A property moved out of a city/type still sits in searches for the old one
+    old_city = instance.get_loaded_value('city')
+    old_type = instance.get_loaded_value('property_type')
+    if old_city is not None and (old_city, old_type) != (instance.city, instance.property_type):
+        search_cache.invalidate(old_city, old_type)
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_cached_pages(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'view_count', 'favorite_count'}:
+        return
+    invalidate_tags(LISTINGS_TAG, property_tag(instance.pk))
+
+
+@receiver(post_delete, sender=Property)
+def record_deleted_property(sender, instance, **kwargs):
+    # Hard deletes leave no row for the incremental export to report as inactive
+    DeletedProperty.objects.update_or_create(
+        property_id=instance.pk, defaults={'deleted_at': timezone.now()}
+    )
+
+
+# Fields that feed similarity scoring or decide whether a listing is recommended
+SIMILARITY_FIELDS = {
+    'price_per_month', 'room_type', 'city', 'nearest_university', 'latitude', 'longitude',
+    'is_active', 'is_verified', 'furnished', 'has_kitchen', 'has_laundry', 'has_parking',
+    'has_gym', 'has_pool', 'pet_friendly', 'utilities_included', 'wifi_included',
+}
+
+
+@receiver(post_save, sender=Property)
+def schedule_similarity_refresh(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not SIMILARITY_FIELDS & set(update_fields):
+        return
+    from .tasks import update_similar_properties_task
+    property_id = str(instance.pk)
+    transaction.on_commit(lambda: enqueue(update_similar_properties_task, property_id))
+
+
+@receiver(post_save, sender=PropertyImage)
+def schedule_image_variants(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (not update_fields or 'image' not in update_fields):
+        return
+    from .tasks import generate_image_variants_task
+    image_id = instance.pk
+    transaction.on_commit(lambda: enqueue(generate_image_variants_task, image_id))
+
+
+@receiver(post_delete, sender=PropertyImage)
+def remove_image_variants(sender, instance, **kwargs):
+    transaction.on_commit(lambda: delete_variants(instance))
+
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def touch_property_on_image_change(sender, instance, **kwargs):
+    # Cached listing cards and the export feed key on updated_at, and both show the primary image
+    Property.objects.filter(pk=instance.property_id).update(updated_at=timezone.now())
+    invalidate_tags(LISTINGS_TAG, property_tag(instance.property_id))
@@ -0,0 +1,151 @@
+import math
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from .facets import AMENITY_FACETS
+from .geo import haversine_km
+from .models import PendingSimilarityRefresh, Property, SimilarProperty
+
+TOP_K = 8
+CANDIDATE_LIMIT = 500
+# Pending neighbor refreshes claimed per batch
+REFRESH_BATCH_SIZE = 500
+# Geohash prefix length used to pull nearby candidates (~20km cells)
+NEARBY_PRECISION = 4
+
+AMENITY_FIELDS = [field for field, label in AMENITY_FACETS] + ['has_kitchen']
+
+WEIGHTS = {
+    'price': 0.30,
+    'amenities': 0.20,
+    'location': 0.20,
+    'room_type': 0.15,
+    'university': 0.15,
+}
+
+
+def _amenity_set(prop):
+    return {field for field in AMENITY_FIELDS if getattr(prop, field)}
+
+
+def similarity_score(a, b):
+    price_a, price_b = float(a.price_per_month), float(b.price_per_month)
+    price = 1 - min(abs(price_a - price_b) / max(price_a, price_b, 1), 1)
+
+    amenities_a, amenities_b = _amenity_set(a), _amenity_set(b)
+    union = amenities_a | amenities_b
+    amenities = len(amenities_a & amenities_b) / len(union) if union else 1.0
+
+    if None not in (a.latitude, a.longitude, b.latitude, b.longitude):
+        # Decays to ~0.37 at 5km
+        location = math.exp(-haversine_km(a.latitude, a.longitude, b.latitude, b.longitude) / 5)
+    else:
+        location = 1.0 if a.city.lower() == b.city.lower() else 0.0
+
+    return (
+        WEIGHTS['price'] * price +
+        WEIGHTS['amenities'] * amenities +
+        WEIGHTS['location'] * location +
+        WEIGHTS['room_type'] * (a.room_type == b.room_type) +
+        WEIGHTS['university'] * (a.nearest_university.strip().lower() == b.nearest_university.strip().lower())
+    )
+
+
+def is_recommendable(prop):
+    return prop.is_active and prop.is_verified
+
+
+def candidate_queryset(prop):
+    nearby = Q(city__iexact=prop.city) | Q(nearest_university__iexact=prop.nearest_university)
+    if prop.geohash:
+        nearby |= Q(geohash__startswith=prop.geohash[:NEARBY_PRECISION])
+    return Property.objects.filter(nearby, is_active=True, is_verified=True).exclude(pk=prop.pk)
+
+
+def rank_neighbors(prop, candidates):
+    scored = sorted(
+        ((similarity_score(prop, candidate), candidate) for candidate in candidates),
+        key=lambda item: item[0],
+        reverse=True
+    )
+    return scored[:TOP_K]
+
+
+def store_neighbors(prop, scored):
+    with transaction.atomic():
+        SimilarProperty.objects.filter(property=prop).delete()
+        SimilarProperty.objects.bulk_create([
+            SimilarProperty(property=prop, neighbor=neighbor, score=score, rank=rank)
+            for rank, (score, neighbor) in enumerate(scored)
+        ])
+
+
+def refresh_similar_properties(prop):
+    """Recompute ``prop``'s own top-K list and return the candidates it was scored against."""
+    if not is_recommendable(prop):
+        SimilarProperty.objects.filter(property=prop).delete()
+        return []
+
+    candidates = list(candidate_queryset(prop)[:CANDIDATE_LIMIT])
+    store_neighbors(prop, rank_neighbors(prop, candidates))
+    return candidates
+
+
+def affected_neighbors(prop, candidates):
+    """
+    Listings whose lists ``prop``'s change can alter: those that currently
+    include it, and those it now scores into the top K of.
+    """
+    affected = set(SimilarProperty.objects.filter(neighbor=prop).values_list('property_id', flat=True))
+
+    if is_recommendable(prop) and candidates:
+        thresholds = {
+            row['property']: (row['lowest'], row['total'])
+            for row in SimilarProperty.objects.filter(property__in=candidates)
+            .values('property')
+            .annotate(lowest=Min('score'), total=Count('pk'))
+        }
+        for candidate in candidates:
+            lowest, total = thresholds.get(candidate.pk, (0, 0))
+            if total < TOP_K or similarity_score(candidate, prop) > lowest:
+                affected.add(candidate.pk)
+    return affected
+
+
+def queue_neighbor_refresh(property_ids):
+    """Mark listings for the next batched refresh; a listing queued twice is re-ranked once."""
+    PendingSimilarityRefresh.objects.bulk_create(
+        [PendingSimilarityRefresh(property_id=property_id) for property_id in property_ids],
+        ignore_conflicts=True
+    )
+
+
+def refresh_pending_neighbors(batch_size=REFRESH_BATCH_SIZE):
+    """Re-rank every queued listing once, however many changes queued it."""
+    refreshed = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                PendingSimilarityRefresh.objects.select_for_update(skip_locked=True)
+                .values_list('property_id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return refreshed
+            PendingSimilarityRefresh.objects.filter(property_id__in=ids).delete()
+
+        for neighbor in Property.objects.filter(pk__in=ids):
+            refresh_similar_properties(neighbor)
+        refreshed += len(ids)
+
+
+def update_similarity_for(property_id):
+    prop = Property.objects.filter(pk=property_id).first()
+    if prop is None:
+        return 0
+    candidates = refresh_similar_properties(prop)
+    affected = affected_neighbors(prop, candidates)
+    queue_neighbor_refresh(affected)
+    # No beat scheduler runs the batched refresh in local development
+    if settings.CELERY_TASK_ALWAYS_EAGER:
+        refresh_pending_neighbors()
+    return len(affected)
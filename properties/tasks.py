@@ -0,0 +1,35 @@
+from celery import shared_task
+from django.core.management import call_command
+
+
+@shared_task
+def reconcile_favorite_counts_task():
+    call_command('reconcile_favorite_counts', batch_size=1000)
+
+
+@shared_task
+def flush_view_counts_task():
+    from .counters import view_counter
+    return view_counter.flush()
+
+
+@shared_task
+def update_similar_properties_task(property_id):
+    from .similarity import update_similarity_for
+    return update_similarity_for(property_id)
+
+
+@shared_task
+def refresh_pending_neighbors_task():
+    from .similarity import refresh_pending_neighbors
+    return refresh_pending_neighbors()
+
+
+@shared_task
+def generate_image_variants_task(image_id):
+    from .images import generate_variants
+    from .models import PropertyImage
+    image = PropertyImage.objects.filter(pk=image_id).first()
+    if image is None:
+        return None
+    return generate_variants(image)
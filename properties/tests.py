@@ -1,3 +1,224 @@
+import datetime
+import io
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from accounts.models import User
+from .facets import compute_facets
+from .geo import bounding_box, covering_geohashes, encode_geohash, filter_within_radius
+from .importer import NOT_UTF8, import_properties
+from .models import PendingSimilarityRefresh, Property
+from .pagination import KeysetPaginator
+from .search_cache import SearchResultCache
 
-# Create your tests here.
+BOSTON = (42.3601, -71.0589)
+
+
+def make_property(landlord, **fields):
+    values = {
+        'title': 'Flat near campus', 'description': 'Quiet and close to the library',
+        'property_type': 'apartment', 'room_type': 'single', 'address': '1 College Road',
+        'city': 'Boston', 'state': 'MA', 'zip_code': '02115', 'price_per_month': 900,
+        'bedrooms': 2, 'bathrooms': 1, 'nearest_university': 'Northeastern University',
+        'distance_to_university': 1, 'available_from': datetime.date.today(),
+        'maximum_occupants': 2, 'is_active': True, 'is_verified': True,
+    }
+    values.update(fields)
+    return Property.objects.create(landlord=landlord, **values)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.landlord = User.objects.create_user(username='landlord', password='password', user_type='landlord')
+        cls.properties = [make_property(cls.landlord, title=f'Flat {i}') for i in range(5)]
+        # Identical timestamps leave the id as the only tiebreaker
+        Property.objects.filter(pk__in=[p.pk for p in cls.properties[1:4]]).update(
+            created_at=cls.properties[1].created_at
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, paginator):
+        seen = []
+        page = paginator.page()
+        seen += list(page)
+        while page.next_cursor:
+            page = paginator.page(page.next_cursor)
+            seen += list(page)
+        return seen
+
+    def test_pages_cover_every_listing_once(self):
+        seen = self.walk(KeysetPaginator(Property.objects.filter(is_active=True), 2))
+        self.assertEqual(len(seen), 5)
+        self.assertEqual({p.pk for p in seen}, {p.pk for p in self.properties})
+
+    def test_new_listing_does_not_shift_later_pages(self):
+        paginator = KeysetPaginator(Property.objects.filter(is_active=True), 2)
+        first = paginator.page()
+        make_property(self.landlord, title='Brand new flat')
+
+        rest = []
+        page = paginator.page(first.next_cursor)
+        rest += list(page)
+        while page.next_cursor:
+            page = paginator.page(page.next_cursor)
+            rest += list(page)
+
+        self.assertEqual({p.pk for p in list(first) + rest}, {p.pk for p in self.properties})
+        self.assertEqual(len(rest), 3)
+
+    def test_previous_cursor_returns_the_earlier_page(self):
+        paginator = KeysetPaginator(Property.objects.filter(is_active=True), 2)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        back = paginator.page(second.previous_cursor)
+        self.assertEqual([p.pk for p in back], [p.pk for p in first])
+        self.assertFalse(back.has_previous())
+
+
+class GeoSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        landlord = User.objects.create_user(username='landlord', password='password', user_type='landlord')
+        cls.near = make_property(landlord, title='Near', latitude=42.3700, longitude=-71.0600)
+        # Inside the 5km bounding box but beyond the radius
+        cls.corner = make_property(landlord, title='Corner', latitude=42.4000, longitude=-71.0050)
+        cls.far = make_property(landlord, title='Far', latitude=42.5000, longitude=-71.0000)
+
+    def test_cover_includes_the_cells_of_points_in_the_box(self):
+        cells = covering_geohashes(*bounding_box(*BOSTON, 5))
+        for property_obj in (self.near, self.corner):
+            self.assertTrue(any(property_obj.geohash.startswith(cell) for cell in cells))
+        self.assertFalse(any(self.far.geohash.startswith(cell) for cell in cells))
+
+    def test_geohash_is_set_on_save(self):
+        self.assertEqual(self.near.geohash, encode_geohash(42.3700, -71.0600))
+
+    def test_radius_filter_trims_box_corners(self):
+        found = filter_within_radius(Property.objects.all(), *BOSTON, 5)
+        self.assertEqual([p.pk for p in found], [self.near.pk])
+        self.assertLess(found[0].distance_km, 5)
+
+
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.search_cache = SearchResultCache()
+
+    def cached_key(self, **cleaned_data):
+        key = self.search_cache.make_key(cleaned_data)
+        self.search_cache.set(key, [1, 2], city=cleaned_data.get('city'),
+                              property_type=cleaned_data.get('property_type'))
+        return key
+
+    def test_save_in_matching_city_invalidates(self):
+        partial = {'city': 'bos', 'property_type': 'apartment'}
+        any_type = {'city': 'Boston'}
+        partial_key, any_type_key = self.cached_key(**partial), self.cached_key(**any_type)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.search_cache.invalidate('Boston', 'apartment')
+
+        self.assertNotEqual(self.search_cache.make_key(partial), partial_key)
+        self.assertNotEqual(self.search_cache.make_key(any_type), any_type_key)
+        self.assertIsNone(self.search_cache.get(self.search_cache.make_key(partial)))
+
+    def test_other_cities_and_types_survive(self):
+        other_city = {'city': 'Chicago'}
+        other_type = {'city': 'Boston', 'property_type': 'house'}
+        other_city_key, other_type_key = self.cached_key(**other_city), self.cached_key(**other_type)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.search_cache.invalidate('Boston', 'apartment')
+
+        self.assertEqual(self.search_cache.make_key(other_city), other_city_key)
+        self.assertEqual(self.search_cache.make_key(other_type), other_type_key)
+        self.assertEqual(self.search_cache.get(other_city_key), [1, 2])
+
+    def test_invalidation_waits_for_commit(self):
+        key = self.cached_key(city='Boston')
+        with self.captureOnCommitCallbacks(execute=False):
+            self.search_cache.invalidate('Boston', 'apartment')
+        self.assertEqual(self.search_cache.make_key({'city': 'Boston'}), key)
+
+
+class FacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        landlord = User.objects.create_user(username='landlord', password='password', user_type='landlord')
+        make_property(landlord, property_type='apartment', room_type='single', price_per_month=800, furnished=True)
+        make_property(landlord, property_type='apartment', room_type='double', price_per_month=1200)
+        make_property(landlord, property_type='house', room_type='single', price_per_month=1600, furnished=True)
+
+    def counts(self, facets, group, key='value'):
+        return {entry[key]: entry['count'] for entry in facets[group]}
+
+    def test_counts_without_filters(self):
+        facets = compute_facets(Property.objects.all(), {})
+        self.assertEqual(facets['total'], 3)
+        self.assertEqual(self.counts(facets, 'property_type')['apartment'], 2)
+        self.assertEqual(self.counts(facets, 'amenities', 'field')['furnished'], 2)
+        self.assertEqual([entry['count'] for entry in facets['price']], [0, 1, 1, 1, 0])
+
+    def test_group_ignores_its_own_filter(self):
+        facets = compute_facets(Property.objects.all(), {'property_type': 'apartment'})
+        self.assertEqual(facets['total'], 2)
+        # Selecting apartments must not zero out houses in the same group
+        self.assertEqual(self.counts(facets, 'property_type')['house'], 1)
+        self.assertEqual(self.counts(facets, 'room_type'), {
+            'single': 1, 'double': 1, 'triple': 0, 'entire': 0, 'shared': 0,
+        })
+        self.assertEqual(self.counts(facets, 'amenities', 'field')['furnished'], 1)
+
+
+class ImportTests(TestCase):
+    HEADER = (
+        'title,description,property_type,room_type,address,city,state,zip_code,country,'
+        'nearest_university,distance_to_university,bedrooms,bathrooms,maximum_occupants,'
+        'minimum_stay_months,price_per_month,security_deposit,available_from,furnished\n'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.landlord = User.objects.create_user(username='landlord', password='password', user_type='landlord')
+
+    def row(self, title, price='900'):
+        available_from = (timezone.localdate() + datetime.timedelta(days=30)).isoformat()
+        return (
+            f'{title},Two rooms,apartment,single,1 College Road,Boston,MA,02115,US,'
+            f'Northeastern University,1,2,1,2,1,{price},0,{available_from},yes\n'
+        )
+
+    def test_bad_rows_are_reported_and_the_rest_imported(self):
+        data = (
+            self.HEADER + self.row('Good flat') + self.row('No price', price='')
+        ).encode('utf-8') + self.row('Caf\xe9 flat').encode('latin-1') + self.row('Another flat').encode('utf-8')
+
+        result = import_properties(io.BytesIO(data), self.landlord)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.failed, 2)
+        self.assertEqual([error['line'] for error in result.errors], [3, 4])
+        self.assertIn('price_per_month', result.errors[0]['errors'])
+        self.assertEqual(result.errors[1]['errors'], {'__all__': [NOT_UTF8]})
+        self.assertEqual(
+            set(Property.objects.values_list('title', flat=True)), {'Good flat', 'Another flat'}
+        )
+        self.assertTrue(Property.objects.get(title='Good flat').furnished)
+
+    def test_invalid_json_lines_are_reported(self):
+        data = b'{"title": "Missing everything"}\nnot json\n[1, 2]\n'
+        result = import_properties(io.BytesIO(data), self.landlord, fmt='jsonl')
+        self.assertEqual(result.created, 0)
+        self.assertEqual([error['line'] for error in result.errors], [1, 2, 3])
+        self.assertIn('Invalid JSON', result.errors[1]['errors']['__all__'][0])
+
+    def test_imported_listings_are_queued_for_similarity(self):
+        data = (self.HEADER + self.row('Good flat') + self.row('Another flat')).encode('utf-8')
+        import_properties(io.BytesIO(data), self.landlord)
+        self.assertEqual(
+            set(PendingSimilarityRefresh.objects.values_list('property_id', flat=True)),
+            set(Property.objects.values_list('pk', flat=True)),
+        )
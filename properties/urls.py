@@ -1,15 +1,19 @@
 from django.urls import path
 from .views import (PropertyListView, PropertyDetailView, create_property,
                    update_property, delete_property, toggle_favorite,
-                   my_properties, my_favorites)
+                   my_properties, my_favorites, search_cache_stats,
+                   bulk_import_properties, export_feed)
 
 urlpatterns = [
     path('', PropertyListView.as_view(), name='property_list'),
     path('<uuid:pk>/', PropertyDetailView.as_view(), name='property_detail'),
     path('create/', create_property, name='property_create'),
+    path('import/', bulk_import_properties, name='property_import'),
     path('<uuid:pk>/update/', update_property, name='property_update'),
     path('<uuid:pk>/delete/', delete_property, name='property_delete'),
     path('<uuid:pk>/favorite/', toggle_favorite, name='toggle_favorite'),
     path('my-properties/', my_properties, name='my_properties'),
     path('favorites/', my_favorites, name='my_favorites'),
+    path('feed/', export_feed, name='property_feed'),
+    path('search-cache/stats/', search_cache_stats, name='search_cache_stats'),
 ]
\ No newline at end of file
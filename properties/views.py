@@ -1,79 +1,174 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Q, Count, F
+from django.core.paginator import InvalidPage, Paginator
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import Http404, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_datetime
+from django.conf import settings
 from django.urls import reverse_lazy
-from .models import Property, PropertyImage, FavoriteProperty, Amenity
+from .models import Property, PropertyImage, FavoriteProperty, Amenity, prefetch_primary_images
 from .forms import PropertyForm, PropertySearchForm
-from accounts.decorators import landlord_required
+from .geo import annotate_distance, filter_within_bbox, filter_within_radius
+from .counters import view_counter
+from .pagination import KEYSET_ORDERING, CachedCountPaginator, InvalidCursor, KeysetPaginator
+from .facets import compute_facets, facet_filters
+from .export import FORMATS as EXPORT_FORMATS, stream_export
+from .importer import FORMATS, detect_format, import_properties
+from .search import search_properties
+from .search_cache import search_cache
+from accounts.decorators import landlord_required, admin_required
+from bookings.availability import filter_available
+from core.metrics import record_cache_lookup
+from core.page_cache import AVAILABILITY_TAG, LISTINGS_TAG, AnonymousPageCacheMixin, property_tag
+from core.stats import ACTIVE_PROPERTIES, VERIFIED_PROPERTIES, get_site_stats
 
-class PropertyListView(ListView):
+class PropertyListView(AnonymousPageCacheMixin, ListView):
     model = Property
     template_name = 'properties/list.jinja'
     context_object_name = 'properties'
     paginate_by = 12
+    paginator_class = CachedCountPaginator
+    cached_ids = None
+    
+    def get_page_cache_tags(self):
+        if self.request.GET.get('move_in') and self.request.GET.get('move_out'):
+            return [LISTINGS_TAG, AVAILABILITY_TAG]
+        return [LISTINGS_TAG]
     
     def get_queryset(self):
+        form = self.search_form = PropertySearchForm(self.request.GET)
+        queryset = self.get_search_queryset(form)
+        if not form.is_valid():
+            return queryset.with_primary_image()
+        
+        # Serve the ordered ID list from the search cache when this search was seen recently
+        cache_key = search_cache.make_key(form.cleaned_data)
+        ids = search_cache.get(cache_key)
+        record_cache_lookup('property_search', ids is not None)
+        if ids is None:
+            ids = list(queryset.values_list('pk', flat=True)[:search_cache.max_ids + 1])
+            if len(ids) > search_cache.max_ids:
+                # Too broad to be worth caching
+                return queryset.with_primary_image()
+            search_cache.set(
+                cache_key, ids,
+                city=form.cleaned_data.get('city'),
+                property_type=form.cleaned_data.get('property_type')
+            )
+        
+        # Listings deactivated since the search was cached drop out here
+        queryset = Property.objects.filter(is_active=True, pk__in=ids).select_related('landlord').with_primary_image()
+        if self.list_ordering == KEYSET_ORDERING:
+            return queryset.order_by(*KEYSET_ORDERING)
+        # Other orderings page through the cached ID list; only that page's rows are fetched
+        self.cached_ids = ids
+        return queryset
+    
+    def get_search_queryset(self, form):
         queryset = Property.objects.filter(is_active=True).select_related('landlord')
+        ordering = KEYSET_ORDERING
+        self.facet_queryset = queryset
         
         # Apply filters from form
-        form = PropertySearchForm(self.request.GET)
         if form.is_valid():
             query = form.cleaned_data.get('query')
             city = form.cleaned_data.get('city')
-            min_price = form.cleaned_data.get('min_price')
-            max_price = form.cleaned_data.get('max_price')
-            property_type = form.cleaned_data.get('property_type')
-            room_type = form.cleaned_data.get('room_type')
-            bedrooms = form.cleaned_data.get('bedrooms')
-            furnished = form.cleaned_data.get('furnished')
-            pet_friendly = form.cleaned_data.get('pet_friendly')
-            utilities_included = form.cleaned_data.get('utilities_included')
-            has_parking = form.cleaned_data.get('has_parking')
+            lat = form.cleaned_data.get('lat')
+            lng = form.cleaned_data.get('lng')
+            radius_km = form.cleaned_data.get('radius_km')
+            bbox = form.cleaned_data.get('bbox')
+            sort = form.cleaned_data.get('ordering')
+            move_in = form.cleaned_data.get('move_in')
+            move_out = form.cleaned_data.get('move_out')
             
             if query:
-                queryset = queryset.filter(
-                    Q(title__icontains=query) |
-                    Q(description__icontains=query) |
-                    Q(address__icontains=query) |
-                    Q(city__icontains=query) |
-                    Q(nearest_university__icontains=query)
-                )
+                queryset = search_properties(queryset, query)
+                if 'search_rank' in queryset.query.annotations:
+                    ordering = ['-is_verified', '-search_rank', '-created_at']
             if city:
                 queryset = queryset.filter(city__icontains=city)
-            if min_price:
-                queryset = queryset.filter(price_per_month__gte=min_price)
-            if max_price:
-                queryset = queryset.filter(price_per_month__lte=max_price)
-            if property_type:
-                queryset = queryset.filter(property_type=property_type)
-            if room_type:
-                queryset = queryset.filter(room_type=room_type)
-            if bedrooms:
-                queryset = queryset.filter(bedrooms=bedrooms)
-            if furnished:
-                queryset = queryset.filter(furnished=True)
-            if pet_friendly:
-                queryset = queryset.filter(pet_friendly=True)
-            if utilities_included:
-                queryset = queryset.filter(utilities_included=True)
-            if has_parking:
-                queryset = queryset.filter(has_parking=True)
+            
+            # Spatial search: viewport box or radius around a point
+            if bbox:
+                queryset = filter_within_bbox(queryset, *bbox)
+            elif radius_km:
+                queryset = filter_within_radius(queryset, lat, lng, radius_km)
+            
+            if move_in and move_out:
+                queryset = filter_available(queryset, move_in, move_out)
+            
+            # Facet counts are computed over the results before the facet filters narrow them
+            self.facet_queryset = queryset
+            queryset = queryset.filter(*facet_filters(form.cleaned_data).values())
+            
+            if sort == 'distance':
+                if 'distance_km' not in queryset.query.annotations:
+                    queryset = annotate_distance(queryset, *form.get_search_center())
+                ordering = ['distance_km', '-is_verified', '-created_at']
+            elif sort:
+                ordering = [sort, '-is_verified', '-created_at']
         
-        # Order by verified first, then by creation date
-        queryset = queryset.order_by('-is_verified', '-created_at')
+        # Order by verified first, then by relevance (when searching) and creation date
+        self.list_ordering = ordering
+        queryset = queryset.order_by(*ordering)
         return queryset
     
+    def paginate_queryset(self, queryset, page_size):
+        if self.cached_ids is not None:
+            return self.paginate_cached_ids(page_size)
+        
+        # Cursor pagination for the default ordering; ?page= links keep working via OFFSET
+        if self.list_ordering != KEYSET_ORDERING or self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid page cursor.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+    
+    def paginate_cached_ids(self, page_size):
+        paginator = Paginator(self.cached_ids, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.page_kwarg) or 1)
+        except InvalidPage:
+            raise Http404('Invalid page.')
+        
+        rows = Property.objects.filter(
+            is_active=True, pk__in=page.object_list
+        ).select_related('landlord').with_primary_image()
+        center = self.search_form.get_search_center()
+        if center:
+            rows = annotate_distance(rows, *center)
+        by_pk = {row.pk: row for row in rows}
+        page.object_list = [by_pk[pk] for pk in page.object_list if pk in by_pk]
+        return (paginator, page, page.object_list, page.has_other_pages())
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['search_form'] = PropertySearchForm(self.request.GET)
+        context['search_form'] = self.search_form
+        context['facets'] = compute_facets(
+            self.facet_queryset,
+            self.search_form.cleaned_data if self.search_form.is_valid() else {}
+        )
+        
+        # Query string shared by pagination links
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        params.pop('cursor', None)
+        context['pagination_query'] = params.urlencode()
         
         # Add statistics
-        context['total_properties'] = Property.objects.filter(is_active=True).count()
-        context['verified_properties'] = Property.objects.filter(is_active=True, is_verified=True).count()
+        stats = get_site_stats()
+        context['total_properties'] = stats[ACTIVE_PROPERTIES]
+        context['verified_properties'] = stats[VERIFIED_PROPERTIES]
         
         # Check favorites for authenticated users
         if self.request.user.is_authenticated:
@@ -84,28 +179,40 @@ class PropertyListView(ListView):
         
         return context
 
-class PropertyDetailView(DetailView):
+class PropertyDetailView(AnonymousPageCacheMixin, DetailView):
     model = Property
     template_name = 'properties/detail.jinja'
     context_object_name = 'property'
     
+    def get_page_cache_tags(self):
+        # Similar-listing cards make the page depend on other listings too
+        return [LISTINGS_TAG, property_tag(self.kwargs['pk'])]
+    
+    def page_cache_hit(self):
+        view_counter.record(self.kwargs['pk'])
+    
     def get_queryset(self):
-        return Property.objects.filter(is_active=True).select_related('landlord')
+        return Property.objects.filter(is_active=True).select_related('landlord').prefetch_related('images', 'amenities')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        property_obj = self.get_object()
+        property_obj = self.object
         
-        # Increment view count
-        property_obj.view_count += 1
-        property_obj.save(update_fields=['view_count'])
+        # Count the view; buffered and written in bulk
+        view_counter.record(property_obj.pk)
         
-        # Get related properties
-        related_properties = Property.objects.filter(
-            is_active=True,
-            is_verified=True,
-            city=property_obj.city
-        ).exclude(id=property_obj.id)[:4]
+        # Get related properties: precomputed neighbors (see properties.similarity),
+        # falling back to same-city listings until the list has been built
+        related_properties = list(Property.objects.filter(
+            similar_to__property=property_obj,
+            is_active=True
+        ).order_by('similar_to__rank').with_primary_image()[:4])
+        if not related_properties:
+            related_properties = Property.objects.filter(
+                is_active=True,
+                is_verified=True,
+                city=property_obj.city
+            ).exclude(id=property_obj.id).with_primary_image()[:4]
         
         # Check if property is in user's favorites
         is_favorite = False
@@ -122,6 +229,12 @@ class PropertyDetailView(DetailView):
             is_approved=True
         ).select_related('reviewer')[:10]
         
+        # Landlords see their listing's daily views
+        if self.request.user == property_obj.landlord:
+            view_history = property_obj.get_view_history()
+            context['view_history'] = view_history
+            context['view_history_max'] = max(views for day, views in view_history) or 1
+        
         context.update({
             'is_favorite': is_favorite,
             'related_properties': related_properties,
@@ -168,6 +281,27 @@ def create_property(request):
     
     return render(request, 'properties/create.jinja', {'form': form})
 
+@login_required
+@landlord_required
+def bulk_import_properties(request):
+    result = None
+    
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        fmt = request.POST.get('format') or detect_format(upload.name if upload else '')
+        if not upload:
+            messages.error(request, 'Please choose a CSV or JSONL file to import.')
+        elif fmt not in FORMATS:
+            messages.error(request, 'Unsupported file format.')
+        else:
+            result = import_properties(upload.file, request.user, fmt=fmt)
+            if result.created:
+                messages.success(request, f'{result.created} properties imported. They will be visible after verification.')
+            if result.failed:
+                messages.error(request, f'{result.failed} rows could not be imported. See the errors below.')
+    
+    return render(request, 'properties/import.jinja', {'result': result, 'formats': FORMATS})
+
 @login_required
 @landlord_required
 def update_property(request, pk):
@@ -234,26 +368,34 @@ def toggle_favorite(request, pk):
     property_obj = get_object_or_404(Property, id=pk, is_active=True)
     
     if request.method == 'POST':
-        favorite, created = FavoriteProperty.objects.get_or_create(
-            user=request.user,
-            property=property_obj
-        )
+        # Counter moves in the same short transaction as the favorite row, as a single
+        # atomic UPDATE: no read-modify-write race and no full-row save bumping updated_at
+        with transaction.atomic():
+            favorite, created = FavoriteProperty.objects.get_or_create(
+                user=request.user,
+                property=property_obj
+            )
+            
+            if created:
+                delta = 1
+            else:
+                # Only the request that actually removed the row decrements
+                deleted, _ = FavoriteProperty.objects.filter(pk=favorite.pk).delete()
+                delta = -1 if deleted else 0
+            
+            if delta:
+                Property.objects.filter(pk=property_obj.pk).update(favorite_count=F('favorite_count') + delta)
         
         if created:
-            property_obj.favorite_count += 1
-            property_obj.save()
             messages.success(request, 'Property added to favorites!')
         else:
-            favorite.delete()
-            property_obj.favorite_count -= 1
-            property_obj.save()
             messages.success(request, 'Property removed from favorites!')
     
     return redirect(request.META.get('HTTP_REFERER', 'property_list'))
 
 @login_required
 def my_properties(request):
-    properties = Property.objects.filter(landlord=request.user).order_by('-created_at')
+    properties = Property.objects.filter(landlord=request.user).order_by('-created_at').with_primary_image()
     
     # Get statistics
     total_properties = properties.count()
@@ -271,10 +413,50 @@ def my_properties(request):
 @login_required
 def my_favorites(request):
     favorites = FavoriteProperty.objects.filter(user=request.user).select_related('property')
-    properties = [fav.property for fav in favorites]
+    properties = prefetch_primary_images([fav.property for fav in favorites])
     
     context = {
         'properties': properties,
         'favorite_count': favorites.count(),
     }
-    return render(request, 'properties/favorites.jinja', context)
\ No newline at end of file
+    return render(request, 'properties/favorites.jinja', context)
+
+@admin_required
+def search_cache_stats(request):
+    return JsonResponse(search_cache.stats())
+
+def _has_feed_access(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    # Header only: a token in the query string ends up in access logs and proxies
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    return bool(token) and any(constant_time_compare(token, allowed) for allowed in settings.PROPERTY_FEED_TOKENS)
+
+def export_feed(request):
+    if not _has_feed_access(request):
+        return HttpResponseForbidden('A valid feed token is required.')
+    
+    fmt = request.GET.get('format', 'jsonl')
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest('format must be jsonl or csv.')
+    
+    updated_since = None
+    if request.GET.get('updated_since'):
+        updated_since = parse_datetime(request.GET['updated_since'])
+        if updated_since is None:
+            return HttpResponseBadRequest('updated_since must be an ISO 8601 timestamp.')
+    
+    compress = request.GET.get('gzip') in ('1', 'true')
+    # Taken before the query starts: the safe updated_since for the next incremental pull
+    generated_at = timezone.now()
+    
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    filename = f'properties.{fmt}'
+    if compress:
+        content_type = 'application/gzip'
+        filename += '.gz'
+    
+    response = StreamingHttpResponse(stream_export(fmt, updated_since, compress), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Feed-Generated-At'] = generated_at.isoformat()
+    return response